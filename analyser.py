@@ -0,0 +1,831 @@
+import os
+import re
+import time
+import heapq
+import queue
+import threading
+from io import BytesIO
+from copy import copy
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, Future
+
+import numpy as np
+from openpyxl import Workbook
+from openpyxl.styles import Font, PatternFill, Alignment, Border, Side, NamedStyle
+from openpyxl.styles.fonts import DEFAULT_FONT
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.utils import get_column_letter
+
+from marks import MarkStore, EMPTY, PERIODS, get_period_index, get_needed_marks, classify_all
+from stats import StageStats
+from export import TABLES, get_export_filenames, write_tables
+from readers import get_engine, open_workbook
+
+
+REPORT_STYLES = {  # стили результирующего файла:
+    # название: (выравнивание по горизонтали, по вертикали, жирный шрифт, заливка, границы слева, справа, сверху, снизу)
+    'number_title': ('center', 'center', False, False, None, 'thin', None, None),
+    'number_border': (None, None, False, False, None, 'thin', None, None),
+    'number_border_last': (None, None, False, False, None, 'thin', None, 'thin'),
+    'name_title': ('center', 'center', False, False, None, 'thick', None, None),
+    'name_border': (None, None, False, False, None, 'thick', None, None),
+    'name_border_last': (None, None, False, False, None, 'thick', None, 'thin'),
+    'subject_title': ('center', None, False, False, None, None, None, None),
+    'subject_title_end': (None, None, False, False, None, 'thick', None, None),
+    'period_title': ('center', None, False, False, None, None, 'thin', 'thin'),
+    'period_border': (None, None, False, False, None, None, 'thin', 'thin'),
+    'period_border_end': (None, None, False, False, None, 'thick', 'thin', 'thin'),
+    'column_title': ('center', None, False, False, None, 'thin', None, 'thin'),
+    'column_title_end': ('center', None, False, False, None, 'thick', None, 'thin'),
+    'classification_title': ('center', 'center', False, False, 'thin', 'thin', None, None),
+    'classification_border': (None, None, False, False, 'thin', 'thin', None, None),
+    'classification_border_last': (None, None, False, False, 'thin', 'thin', None, 'thin'),
+    'number': ('left', None, False, False, None, 'thin', None, None),
+    'number_last': ('left', None, False, False, None, 'thin', None, 'thin'),
+    'mark': ('center', None, False, False, None, 'thin', None, None),
+    'mark_last': ('center', None, False, False, None, 'thin', None, 'thin'),
+    'mark_end': ('center', None, False, False, None, 'thick', None, None),
+    'mark_end_last': ('center', None, False, False, None, 'thick', None, 'thin'),
+    'wrong_mark': ('center', None, True, True, None, 'thin', None, None),
+    'wrong_mark_last': ('center', None, True, True, None, 'thin', None, 'thin'),
+    'wrong_mark_end': ('center', None, True, True, None, 'thick', None, None),
+    'wrong_mark_end_last': ('center', None, True, True, None, 'thick', None, 'thin'),
+    'classification': ('center', None, False, False, 'thin', 'thin', None, None),
+    'classification_last': ('center', None, False, False, 'thin', 'thin', None, 'thin'),
+    'results_title': ('center', None, True, False, None, 'double', None, 'double'),
+    'results': (None, None, False, False, None, 'thin', None, None),
+    'results_last': (None, None, False, False, None, 'thin', None, 'thin'),
+}
+
+SIDES = {  # границы ячеек по названию из REPORT_STYLES
+    'thin': Side(border_style='thin', color='000000'),
+    'thick': Side(border_style='thick', color='000000'),
+    'double': Side(border_style='double', color='000000'),
+    None: Side(),
+}
+
+
+RESULT_PREFIX = 'Заключение по итоговым оценкам_'  # начало имени результирующего файла
+
+ALL_PERIODS = 'Все'  # обработка всех периодов аттестации за один проход
+
+FORM_PATTERN = re.compile(r'(?<!\d)(1[01]|[1-9])-([^\W\d_])')  # номер класса (1-11) и буква через дефис
+
+
+def is_number(mark):
+    if (''.join(mark.split('.'))).isdigit():
+        return True
+    return False
+
+
+def get_needed_mark(mark):
+    if not is_number(mark):
+        return mark
+    else:
+        mark = float(mark)
+
+    if mark == 0:
+        return '0'
+    elif mark < 2.5:
+        return '2'
+    elif mark < 3.5:
+        return '3'
+    elif mark < 4.5:
+        return '4'
+    return '5'
+
+
+def get_value(row, index):  # значение ячейки строки (строки в режиме чтения могут быть короче)
+    if index < len(row):
+        return row[index]
+    return None
+
+
+def get_final_period_index(form_num, period):  # номер периода в хранилище по названию столбца итоговых оценок
+    if int(form_num) in (10, 11):
+        periods = {'Первое полугодие': 0, 'Второе полугодие': 1}
+    else:
+        periods = {'1 триместр': 0, '2 триместр': 1, '3 триместр': 2}
+    if period == 'Год':  # если это годовая оценка
+        return 3
+    return periods.get(period)
+
+
+def get_form_periods(form, period):  # список периодов для обработки (ALL_PERIODS - все периоды класса)
+    if period != ALL_PERIODS:
+        return [period]
+    if int(form.split('-')[0]) in (10, 11):
+        return ['1', '2', 'Год']
+    return ['1', '2', '3', 'Год']
+
+
+def get_period_name(form, period):  # название периода аттестации в результирующем файле
+    if not period.isdigit():
+        return 'Год'
+    elif int(form.split('-')[0]) in (10, 11):
+        return '{}-е полугодие'.format(period)
+    return '{}-й триместр'.format(period)
+
+
+def check_form(form, period):  # проверка названия класса и периода, возвращает текст ошибки
+    if form == '':  # проверка на то, что класс не указан
+        return 'Класс не указан'
+    if '-' not in form or not form.split('-')[0].isdigit():  # проверка формата названия класса
+        return 'Неправильный формат названия класса'
+    if int(form.split('-')[0]) in (10, 11) and period == '3':
+        return 'Неправильный формат периода аттестации'
+    return None
+
+
+def split_forms(forms, period):  # разделение найденных в папке классов на обрабатываемые за период
+    # и пропускаемые (класс -> причина), например 10-11 классы при обработке 3 триместра
+    checked, skipped = [], {}
+    for form in forms:
+        error = check_form(form, period)
+        if error:
+            skipped[form] = error
+        else:
+            checked.append(form)
+    return checked, skipped
+
+
+def prepare_form(filename, form, period, final_marks=None, out_path='', write_only=False, cache=None,
+                 form_files=None, trace_memory=False, output_format='xlsx'):
+    # обработка класса до записи результата, возвращает имя нового файла, анализатор, функцию записи файла
+    # и несовпадающие оценки строками таблицы results (отсортированы по предметам, как на листе Results)
+    # (книга сжимается здесь же: это работа интерпретатора, и в другом потоке она не ускорится)
+    analyser = ExcelMarksAnalyser(trace_memory)
+    base_filename = os.path.join(out_path, '{}{}'.format(RESULT_PREFIX, form))
+
+    analyser.analyse_file(filename, form, period, final_marks, cache, form_files)
+    if output_format == 'xlsx':
+        new_filename = base_filename + '.xlsx'
+        workbook, wrong_marks = analyser.build_resulting_file(form, period, write_only)
+        data = analyser.serialize_workbook(workbook)
+        mismatches = [[form, mark['period'], mark['name'], mark['subject'], mark['average'], mark['recommended'],
+                       mark['actual']] for mark in wrong_marks]
+        return new_filename, analyser, lambda: analyser.write_file(new_filename, data), mismatches
+
+    new_filename = get_export_filenames(base_filename, output_format)['marks']
+    with analyser.stats.measure('report'):
+        tables = analyser.get_tables(form, period)
+    return new_filename, analyser, lambda: analyser.save_export_files(tables, base_filename, output_format), \
+        tables['results']
+
+
+def analyse_form_job(filename, form, period, final_marks=None, out_path='', write_only=False, keep_data=False,
+                     cache=None, form_files=None, trace_memory=False, output_format='xlsx', writer=None):
+    # обработка класса с перехватом ошибок (keep_data - вернуть анализатор с данными класса, writer - ReportWriter
+    # для записи файла в фоновом потоке, тогда результат дополняется в finish_form_job; mismatches - несовпадающие
+    # оценки для общего листа по школе)
+    start_time = time.time()
+    result = {'form': form, 'filename': None, 'duration': None, 'error': None, 'analyser': None, 'stats': None,
+              'skipped': False, 'mismatches': None}
+
+    try:
+        error = check_form(form, period)
+        if error:
+            raise ValueError(error)
+        result['filename'], analyser, save, result['mismatches'] = prepare_form(
+            filename, form, period, final_marks, out_path, write_only, cache, form_files, trace_memory, output_format)
+        result['stats'] = analyser.stats
+        if keep_data:
+            result['analyser'] = analyser
+        if writer is None:
+            save()
+        else:
+            result['saving'] = writer.submit(save)
+    except Exception as e:
+        result['error'] = str(e)
+
+    result['duration'] = time.time() - start_time
+    return result
+
+
+def finish_form_job(result):  # ожидание записи файла класса в фоновом потоке
+    saving = result.pop('saving', None)
+    if saving is not None:
+        try:
+            result['duration'] += saving.result()
+        except Exception as e:
+            result['error'] = str(e)
+    return result
+
+
+class ReportWriter:  # фоновый поток записи результирующих файлов: пока файл класса записывается на диск
+    # (например, в сетевую папку), обрабатывается следующий класс; очередь ограничена, чтобы не копить файлы в памяти
+    def __init__(self, max_pending=2):
+        self.queue = queue.Queue(max_pending)
+        self.thread = threading.Thread(target=self.run, name='ReportWriter', daemon=True)
+        self.thread.start()
+
+    def submit(self, write):  # метод для добавления записи в очередь, возвращает Future с длительностью записи
+        future = Future()
+        self.queue.put((write, future))  # при заполненной очереди ждём записи предыдущих файлов
+        return future
+
+    def run(self):
+        while True:
+            task = self.queue.get()
+            if task is None:
+                return
+
+            write, future = task
+            start_time = time.time()
+            try:
+                write()
+                future.set_result(time.time() - start_time)
+            except Exception as e:
+                future.set_exception(e)
+
+    def close(self):  # ожидание записи всех файлов из очереди
+        self.queue.put(None)
+        self.thread.join()
+
+
+def analyse_forms(filename, forms, period, jobs=1, out_path='', write_only=False, keep_data=False, cache=None,
+                  form_files=None, stats=None, manifest=None, output_format='xlsx', final_marks=None, mp_context=None):
+    # обработка нескольких классов, результаты выдаются по порядку (stats - BatchStats для замеров этапов,
+    # manifest - Manifest для пропуска классов, входные данные которых не изменились; при keep_data не используется;
+    # final_marks - уже прочитанный FinalMarksIndex файла с итоговыми оценками; mp_context - способ запуска
+    # процессов пула, например spawn при вызове не из главного потока)
+    shared_stats = stats.shared if stats is not None else StageStats()
+    trace_memory = stats is not None and stats.trace_memory
+    if form_files is None:  # папка с файлами средних оценок просматривается один раз
+        form_files = get_form_files(filename)
+
+    loaded = [] if final_marks is None else [final_marks]
+
+    def load_final():  # файл с итоговыми оценками читается один раз и только если он нужен
+        if len(loaded) == 0:
+            with shared_stats.measure('load'):
+                loaded.append(FinalMarksIndex.load(filename, cache))
+        return loaded[0]
+
+    if manifest is not None and not keep_data:
+        changed, unchanged = manifest.check(filename, forms, period, form_files, load_final, output_format)
+    else:
+        manifest, changed, unchanged = None, forms, {}
+
+    results = run_form_jobs(filename, changed, period, jobs, out_path, write_only, keep_data, cache, form_files,
+                            load_final() if len(changed) != 0 else None, trace_memory, output_format, mp_context)
+    try:
+        for form in forms:
+            if form in unchanged.keys():
+                yield {'form': form, 'filename': unchanged[form], 'duration': 0.0, 'error': None, 'analyser': None,
+                       'stats': None, 'skipped': True, 'mismatches': None}
+                continue
+
+            result = next(results)
+            if manifest is not None:
+                if result['error'] is None:
+                    manifest.commit(form, result['filename'])
+                else:
+                    manifest.discard(form)
+            if stats is not None and result['stats'] is not None:
+                stats.add_form(result['form'], result['stats'])
+            yield result
+    finally:  # при отмене обработки сведения об уже обработанных классах сохраняются
+        results.close()
+        if manifest is not None:
+            manifest.save()
+
+
+def run_form_jobs(filename, forms, period, jobs, out_path, write_only, keep_data, cache, form_files, final_marks,
+                  trace_memory, output_format, mp_context=None):
+    # обработка классов в одном процессе или в пуле процессов, результаты выдаются по порядку
+    if jobs <= 1 or len(forms) <= 1:
+        # файл класса записывается в фоновом потоке, пока обрабатывается следующий класс
+        # (кроме замеров памяти: tracemalloc общий для всех потоков)
+        writer = ReportWriter() if len(forms) > 1 and not trace_memory else None
+        pending = deque()
+        try:
+            for form in forms:
+                pending.append(analyse_form_job(filename, form, period, final_marks, out_path, write_only, keep_data,
+                                                cache, form_files, trace_memory, output_format, writer))
+                while len(pending) != 0 and ('saving' not in pending[0].keys() or pending[0]['saving'].done()):
+                    yield finish_form_job(pending.popleft())
+                if len(pending) > 2:  # не больше двух книг в памяти, кроме записываемой
+                    yield finish_form_job(pending.popleft())
+            while len(pending) != 0:
+                yield finish_form_job(pending.popleft())
+        finally:
+            if writer is not None:
+                writer.close()
+        return
+
+    executor = ProcessPoolExecutor(max_workers=jobs, mp_context=mp_context)
+    try:  # каждому процессу передаются только уже прочитанные данные его класса
+        futures = [executor.submit(analyse_form_job, filename, form, period, final_marks.subset(form), out_path,
+                                   write_only, keep_data, cache, form_files, trace_memory, output_format)
+                   for form in forms]
+        for future in futures:
+            yield future.result()
+    finally:  # при отмене обработки не начатые классы снимаются с очереди
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def parse_form(filename):  # название класса в имени файла ("... 5-А.xlsx" -> "5-А")
+    match = FORM_PATTERN.search(filename)
+    if match is None:
+        return None
+    return '{}-{}'.format(match.group(1), match.group(2).upper())
+
+
+def get_form_files(filename):  # индекс файлов со средними оценками в папке файла с итоговыми оценками
+    return FormFileIndex(os.path.dirname(filename), exclude=(os.path.basename(filename),))
+
+
+def read_average_marks(filename, engine=None):  # чтение файла со средними оценками: предметы из шапки и строки
+    # учеников (engine - способ чтения файла, см. readers.py)
+    with open_workbook(filename, engine) as workbook:
+        rows = workbook.iter_rows(workbook.active_sheet(), min_row=6)  # читаем таблицу за один проход
+
+        subjects = list(next(rows, ())[1:])
+        while len(subjects) != 0 and subjects[-1] in ('', None):  # пустые ячейки в конце шапки
+            subjects.pop()
+
+        students = []
+        for row in rows:  # пробегаемся по всем рядам таблицы с учениками
+            student = get_value(row, 0)
+            if student in ('', None):  # проверка на пустоту ячейки
+                break
+            students.append((student, [get_value(row, mark_index + 1) for mark_index in range(len(subjects))]))
+        rows.close()
+
+    return {'subjects': subjects, 'students': students}
+
+
+def add_report_styles(workbook):  # регистрация общих стилей результирующего файла
+    for name, (horizontal, vertical, bold, fill, left, right, top, bottom) in REPORT_STYLES.items():
+        style = NamedStyle(name=name)
+        style.alignment = Alignment(horizontal=horizontal, vertical=vertical)
+        style.font = Font(b=True) if bold else copy(DEFAULT_FONT)
+        if fill:
+            style.fill = PatternFill(start_color='FF4040', end_color='FF4040', fill_type='solid')
+        style.border = Border(left=SIDES[left], right=SIDES[right], top=SIDES[top], bottom=SIDES[bottom])
+        workbook.add_named_style(style)
+
+
+def write_sheet(sheet, rows, merged, widths):  # запись строк из пар (значение, стиль) в лист
+    if sheet.parent.write_only:  # в потоковом режиме строки записываются по порядку и сразу уходят на диск
+        for column, width in widths.items():
+            sheet.column_dimensions[column].width = width
+        for cell_range in merged:
+            sheet.merged_cells.add(cell_range)
+
+        for row in rows:
+            cells = []
+            for cell_data in row:
+                cell = WriteOnlyCell(sheet, None if cell_data is None else cell_data[0])
+                if cell_data is not None and cell_data[1] is not None:
+                    cell.style = cell_data[1]
+                cells.append(cell)
+            sheet.append(cells)
+        return
+
+    for cell_range in merged:  # объединяем ячейки до записи, чтобы не менять границы уже оформленных ячеек
+        sheet.merge_cells(cell_range)
+    for column, width in widths.items():
+        sheet.column_dimensions[column].width = width
+
+    for row_num, row in enumerate(rows, 1):
+        for col_num in range(len(row)):
+            if row[col_num] is None:
+                continue
+            value, style = row[col_num]
+            cell = sheet.cell(row=row_num, column=col_num + 1, value=value)
+            if style is not None:
+                cell.style = style
+
+
+def classify(marks):
+    if 'Н/А' in marks:
+        return 'Есть неаттестации'
+    if 'Нзч' in marks:
+        return 'Есть незачёты'
+    if '2' in marks:
+        return 'Двоечник'
+    if marks.count('3') == 1:
+        return 'С одной 3'
+    if marks.count('3') > 1:
+        return 'Троечник'
+    if marks.count('4') == 1:
+        return 'С одной 4'
+    if marks.count('4') > 1:
+        return 'Хорошист'
+    if '5' in marks:
+        return 'Отличник'
+    return 'Недостаточно данных'
+
+
+def get_collision_error(form, files):  # текст ошибки для класса, для которого найдено несколько файлов
+    return 'Найдено несколько файлов со средними оценками класса {}: {}'.format(
+        form, ', '.join('"{}"'.format(file) for file in files))
+
+
+class FormFileIndex:  # индекс файлов со средними оценками в папке (папка просматривается один раз)
+    def __init__(self, path, exclude=()):
+        self.path = path
+        self.files = {}  # класс -> список подходящих файлов
+
+        for file in sorted(os.listdir(path or '.')):
+            if not file.endswith('.xlsx') or file.startswith('~$') or file in exclude:
+                continue
+            if file.startswith(RESULT_PREFIX):  # результирующие файлы не являются файлами со средними оценками
+                continue
+
+            form = parse_form(file)
+            if form is not None:
+                self.files.setdefault(form, []).append(file)
+
+    def forms(self):  # список найденных классов по порядку
+        return sorted(self.files.keys(), key=lambda form: (int(form.split('-')[0]), form.split('-')[1]))
+
+    def collisions(self, forms=None):  # классы (из forms, по их порядку), для которых найдено несколько файлов
+        return {form: self.files[form] for form in (self.forms() if forms is None else forms)
+                if len(self.files.get(form, [])) > 1}
+
+    def get(self, form):  # метод для получения пути к файлу со средними оценками класса
+        files = self.files.get(form, [])
+        if len(files) == 0:
+            raise ValueError('Файл со средними оценками не найден')
+        if len(files) > 1:
+            raise ValueError(get_collision_error(form, files))
+        return os.path.join(self.path, files[0])
+
+
+class FinalMarksIndex:  # индекс всех классов из файла с итоговыми оценками (файл читается один раз)
+    def __init__(self, filename, forms=None, engine=None):
+        self.filename = filename
+        self.forms = {}
+
+        if forms is not None:  # данные уже прочитаны
+            self.forms = forms
+            return
+
+        with open_workbook(filename, engine) as workbook:
+            for title in workbook.sheet_names():  # пробегаемся по всем листам с номерами классов
+                if title.isdigit():
+                    self.index_sheet(title, workbook.iter_rows(title))
+
+    def index_sheet(self, title, rows):  # метод для поиска всех классов на листе за один проход по строкам
+        form, form_data, subject_row = None, None, None
+        for row_num, row in enumerate(rows, 1):
+            if form_data is not None:
+                if row_num == subject_row:  # строка с названиями предметов
+                    form_data['subjects'] = row
+                    continue
+                if row_num == subject_row + 1:  # строка с периодами аттестации
+                    self.read_header(form_data, row)
+                    continue
+                if row_num > subject_row + 1:  # строки с учениками
+                    student_name = get_value(row, 0)
+                    if student_name not in (None, ''):
+                        form_data['students'].append((student_name, [get_value(row, col + 1) for col
+                                                                     in range(len(form_data['periods']))]))
+                        continue
+
+                    form_data['last_row'] = row_num - 1
+                    if form not in self.forms.keys():
+                        self.forms[form] = form_data
+                    form, form_data = None, None
+                else:
+                    continue
+
+            value = get_value(row, 1)
+            if isinstance(value, str) and '-' in value and value.split('-')[0] == title:  # начало блока класса
+                form, subject_row = value, row_num + 2
+                form_data = {'subjects': [], 'periods': [], 'students': [], 'sheet': title,
+                             'first_row': row_num, 'last_row': None}  # лист и строки блока для манифеста
+
+        if form_data is not None:
+            form_data['last_row'] = row_num
+            if form not in self.forms.keys():
+                self.forms[form] = form_data
+
+    @staticmethod
+    def read_header(form_data, periods_row):  # метод для разбора шапки блока класса
+        subjects_row = form_data['subjects']
+        subjects, periods = [], []
+
+        col = 1
+        while get_value(periods_row, col) not in (None, ''):
+            subject = get_value(subjects_row, col)
+            if subject in (None, ''):
+                subject = subjects[-1]
+            subjects.append(subject)
+            periods.append(get_value(periods_row, col))
+            col += 1
+
+        form_data['subjects'], form_data['periods'] = subjects, periods
+
+    @staticmethod
+    def load(filename, cache=None):  # метод для получения индекса с использованием кэша прочитанных файлов
+        if cache is None:
+            return FinalMarksIndex(filename)
+        return FinalMarksIndex(filename, cache.get('final/' + get_engine(), filename,
+                                                   lambda name: FinalMarksIndex(name).forms))
+
+    def subset(self, form):  # индекс только с одним классом (для передачи в отдельный процесс)
+        forms = {form: self.forms[form]} if form in self.forms.keys() else {}
+        return FinalMarksIndex(self.filename, forms)
+
+    def get(self, form):
+        if form not in self.forms.keys():
+            raise ValueError('Класс {} не найден в файле с итоговыми оценками'.format(form))
+        return self.forms[form]
+
+
+class ExcelMarksAnalyser:
+    def __init__(self, trace_memory=False):
+        self.marks = MarkStore()
+        self.classifications = {}
+        self.stats = StageStats(trace_memory)  # замеры этапов обработки
+
+    def get_average_marks(self, filename, period, cache=None):  # метод для получения средних баллов из файла
+        with self.stats.measure('load'):
+            if cache is None:
+                average_marks = read_average_marks(filename)
+            else:
+                average_marks = cache.get('average/' + get_engine(), filename, read_average_marks)
+
+        with self.stats.measure('header'):
+            subjects = [self.marks.add_subject(subject) for subject in average_marks['subjects']]
+            if period == ALL_PERIODS:  # средние баллы файла используются для всех периодов
+                period_indexes = range(PERIODS)
+            else:
+                period_indexes = [get_period_index(period)]
+
+        with self.stats.measure('rows'):
+            for student, marks in average_marks['students']:  # пробегаемся по всем ученикам
+                student = self.marks.add_student(student)
+
+                for mark_index in range(len(subjects)):  # пробегаемся по всем оценкам данного ученика
+                    for period_index in period_indexes:
+                        self.marks.set_average(period_index, student, subjects[mark_index], marks[mark_index])
+
+    def get_final_marks(self, filename, form, final_marks=None, cache=None):  # метод для получения итоговых оценок
+        if final_marks is None:
+            with self.stats.measure('load'):
+                final_marks = FinalMarksIndex.load(filename, cache)
+        form_data = final_marks.get(form)
+
+        form_num = form.split('-')[0]
+
+        with self.stats.measure('header'):  # анализируем шапку
+            subjects = [self.marks.add_subject(subject) for subject in form_data['subjects']]
+            periods = [get_final_period_index(form_num, period) for period in form_data['periods']]
+
+        with self.stats.measure('rows'):
+            for student_name, marks in form_data['students']:  # пробегаемся по всем ученикам нужного класса
+                student = self.marks.add_student(' '.join(student_name.split()[:2]))
+
+                for col in range(len(marks)):  # пробегаемся по всем оценкам данного ученика
+                    if marks[col] in (None, '') or periods[col] is None:
+                        continue
+                    self.marks.set_final(periods[col], student, subjects[col], marks[col])
+
+    def classify_students(self, form, period):  # оценки успеваемости учеников за каждый период
+        with self.stats.measure('classification'):
+            for form_period in get_form_periods(form, period):
+                classifications = classify_all(self.marks.get_finals(get_period_index(form_period)))
+                self.classifications[form_period] = dict(zip(self.marks.students, classifications))
+
+    def analyse_file(self, filename, form, period, final_marks=None, cache=None, form_files=None):
+        # основной метод для обработки данных файлов
+        if form_files is None:
+            form_files = get_form_files(filename)
+
+        self.get_average_marks(form_files.get(form), period, cache)
+        self.get_final_marks(filename, form, final_marks, cache)
+        self.classify_students(form, period)
+
+    def build_resulting_file(self, form, period, write_only=False):  # метод для построения книги без сохранения,
+        # возвращает книгу и список несовпадающих оценок
+        with self.stats.measure('report'):
+            workbook = Workbook(write_only=write_only)
+            if not write_only:  # листы создаются по порядку в add_report_sheets
+                workbook.remove(workbook.active)
+            add_report_styles(workbook)
+            wrong_marks = self.add_report_sheets(workbook, form, period)
+        return workbook, wrong_marks
+
+    def save_resulting_file(self, workbook, filename):  # метод для сжатия и записи книги на диск
+        self.write_file(filename, self.serialize_workbook(workbook))
+
+    def serialize_workbook(self, workbook):  # метод для сжатия книги в память (на диск файл пишется одним блоком,
+        # а не множеством мелких записей архива, что медленно в сетевых папках)
+        with self.stats.measure('save'):
+            data = BytesIO()
+            workbook.save(data)
+            return data.getvalue()
+
+    def write_file(self, filename, data):
+        with self.stats.measure('save'):
+            with open(filename, 'wb') as file:
+                file.write(data)
+
+    def save_export_files(self, tables, base_filename, output_format='csv'):  # метод для записи таблиц на диск
+        with self.stats.measure('save'):
+            return write_tables(tables, base_filename, output_format)
+
+    def get_tables(self, form, period):  # метод для получения данных листов отчёта в виде таблиц (строки по TABLES)
+        students, subjects = sorted(self.marks.students), sorted(self.marks.subjects)
+        tables = {name: [] for name in TABLES.keys()}
+
+        for form_period in get_form_periods(form, period):
+            averages, recommended, finals, wrong = self.get_period_marks(form_period, students, subjects)
+
+            for student_index, student in enumerate(students):
+                for subject_index, subject in enumerate(subjects):
+                    row = [form, form_period, student, subject,
+                           self.marks.decode(averages[student_index, subject_index]),
+                           self.marks.decode(recommended[student_index, subject_index], integer=True),
+                           self.marks.decode(finals[student_index, subject_index], integer=True)]
+                    is_wrong = bool(wrong[student_index, subject_index])
+                    tables['marks'].append(row + [is_wrong])
+                    if is_wrong:
+                        tables['results'].append(row)
+                tables['classifications'].append([form, form_period, student,
+                                                  self.classifications[form_period][student]])
+
+        tables['results'].sort(key=lambda row: row[3])  # как на листе с несовпадениями - по предметам
+        return tables
+
+    def add_report_sheets(self, workbook, form, period, title=None, results_title='Results'):
+        # метод для добавления листов класса в книгу, возвращает список несовпадающих оценок
+        # (при обработке всех периодов - по листу на период и общий лист с несовпадениями)
+        wrong_marks = []
+
+        periods = get_form_periods(form, period)
+        for form_period in periods:
+            sheet_title = title
+            if len(periods) > 1:
+                period_name = get_period_name(form, form_period)
+                sheet_title = period_name if title is None else '{} {}'.format(title, period_name)
+            write_sheet(workbook.create_sheet(sheet_title), *self.get_report_rows(form, form_period, wrong_marks))
+
+        if len(wrong_marks) != 0:
+            write_sheet(workbook.create_sheet(results_title), *self.get_results_rows(wrong_marks, form))
+
+        return wrong_marks
+
+    def get_report_rows(self, form, period, wrong_marks):  # метод для получения строк листа с оценками
+        subjects = sorted(self.marks.subjects)
+        classification_column = 4 + len(subjects) * 3
+
+        merged = ['A1:A3', 'B1:B3']
+        widths = {'A': 8, 'B': 45}
+        if len(self.marks.students) != 0:  # шапка с предметами заполняется по первому ученику
+            for subject_index in range(len(subjects)):
+                subject_column = 3 + subject_index * 3
+                for row in (1, 2):
+                    merged.append('{}{}:{}{}'.format(get_column_letter(subject_column), row,
+                                                     get_column_letter(subject_column + 2), row))
+            merged.append('{0}1:{0}3'.format(get_column_letter(classification_column)))
+            widths[get_column_letter(classification_column)] = 25
+
+        return self.generate_report_rows(form, period, subjects, wrong_marks), merged, widths
+
+    def generate_report_rows(self, form, period, subjects, wrong_marks):
+        period_name = get_period_name(form, period)
+
+        students = sorted(self.marks.students)
+
+        header = [[('Номер', 'number_title'), ('Имя ученика', 'name_title')],
+                  [(None, 'number_border'), (None, 'name_border')],
+                  [(None, 'number_border_last'), (None, 'name_border_last')]]
+        if len(students) != 0:
+            for subject in subjects:
+                header[0] += [(subject, 'subject_title'), None, (None, 'subject_title_end')]
+                header[1] += [(period_name, 'period_title'), (None, 'period_border'), (None, 'period_border_end')]
+                header[2] += [('ср. б.', 'column_title'), ('рек.', 'column_title'), ('фактич.', 'column_title_end')]
+            header[0] += [None, ('Оценка успеваемости', 'classification_title')]
+            header[1] += [None, (None, 'classification_border')]
+            header[2] += [None, (None, 'classification_border_last')]
+        yield from header
+
+        averages, recommended, finals, wrong = self.get_period_marks(period, students, subjects)
+
+        for student_index in range(len(students)):  # пробегаемся по всем ученикам
+            student = students[student_index]
+            last = '_last' if student_index == len(students) - 1 else ''  # у последнего ученика нижняя граница
+            row = [(student_index + 1, 'number' + last), (student, 'name_border' + last)]
+
+            for subject_index in range(len(subjects)):  # пробегаемся по всем предметам
+                average = self.marks.decode(averages[student_index, subject_index])
+                recommended_mark = self.marks.decode(recommended[student_index, subject_index], integer=True)
+                actual = self.marks.decode(finals[student_index, subject_index], integer=True)
+
+                style = 'mark'
+                if wrong[student_index, subject_index]:  # выделяем оценки, не совпадающие с рекомендуемыми
+                    wrong_marks.append({'name': student, 'subject': subjects[subject_index], 'period': period,
+                                        'average': average, 'recommended': recommended_mark, 'actual': actual})
+                    style = 'wrong_mark'
+
+                row += [(average, style + last), (recommended_mark, style + last), (actual, style + '_end' + last)]
+
+            row += [None, (self.classifications[period][student], 'classification' + last)]
+            yield row
+
+    def get_period_marks(self, period, students=None, subjects=None):
+        # матрицы средних баллов, рекомендуемых и итоговых оценок (в кодах хранилища) и несовпадений за период
+        # (строки и столбцы переставляются в порядке students и subjects, по умолчанию - в порядке хранилища)
+        period_index = get_period_index(period)
+        averages = self.marks.get_averages(period_index)
+        finals = self.marks.get_finals(period_index)
+        if students is not None or subjects is not None:
+            rows = [self.marks.student_index[student] for student in students or self.marks.students]
+            cols = [self.marks.subject_index[subject] for subject in subjects or self.marks.subjects]
+            averages, finals = averages[np.ix_(rows, cols)], finals[np.ix_(rows, cols)]
+
+        recommended = get_needed_marks(averages)
+        finals = np.where(finals == EMPTY, 0, finals)
+        return averages, recommended, finals, recommended != finals
+
+    @staticmethod
+    def get_results_rows(wrong_marks, form):  # метод для получения строк листа с несовпадениями
+        wrong_marks.sort(key=lambda el: el['subject'])
+
+        col_names = ('Ученик', 'Предмет', 'Период', 'Ср. б.', 'Рек.', 'Фактич.')
+
+        rows = [[(col_name, 'results_title') for col_name in col_names]]
+        for row in range(len(wrong_marks)):
+            style = 'results_last' if row == len(wrong_marks) - 1 else 'results'
+            mark = wrong_marks[row]
+            rows.append([(value, style) for value in (mark['name'], mark['subject'],
+                                                      get_period_name(form, mark['period']), mark['average'],
+                                                      mark['recommended'], mark['actual'])])
+
+        return rows, [], {'A': 35, 'B': 25, 'C': 20}
+
+
+class SchoolReport:  # общий файл по всем классам (лист на класс), записывается потоково
+    def __init__(self, filename):
+        self.filename = filename
+        self.workbook = Workbook(write_only=True)
+        self.has_styles = False
+
+    def add_form(self, analyser, form, period):  # метод для добавления листов класса, возвращает несовпадения
+        if not self.has_styles:
+            add_report_styles(self.workbook)
+            self.has_styles = True
+        return analyser.add_report_sheets(self.workbook, form, period, form, 'Results {}'.format(form))
+
+    def save(self):
+        if len(self.workbook.worksheets) == 0:
+            self.workbook.create_sheet()
+        self.workbook.save(self.filename)
+
+
+class MismatchSummary:  # общий файл с несовпадающими оценками всех классов и их количеством по предметам и классам
+    # (списки классов уже отсортированы по предметам и сливаются через кучу за один проход, без общей сортировки)
+    def __init__(self, filename):
+        self.filename = filename
+        self.forms = []  # (класс, несовпадения строками таблицы results) по порядку обработки
+
+    def add_form(self, form, mismatches):
+        self.forms.append((form, mismatches))
+
+    def merge(self):  # все несовпадения школы по предметам (внутри предмета - в порядке обработки классов)
+        return heapq.merge(*[mismatches for form, mismatches in self.forms], key=lambda row: row[3])
+
+    def count(self):  # общее количество несовпадений
+        return sum(len(mismatches) for form, mismatches in self.forms)
+
+    def get_results_rows(self, subject_counts):  # строки листа Results; количество несовпадений по предметам
+        # дописывается в subject_counts по ходу записи (предметы идут подряд, поэтому словарь не нужен)
+        yield [(col_name, 'results_title') for col_name in ('Класс', 'Ученик', 'Предмет', 'Период', 'Ср. б.', 'Рек.',
+                                                             'Фактич.')]
+        total = self.count()
+        for row_num, (form, period, student, subject, average, recommended, actual) in enumerate(self.merge(), 1):
+            if len(subject_counts) == 0 or subject_counts[-1][0] != subject:
+                subject_counts.append([subject, 0])
+            subject_counts[-1][1] += 1
+
+            style = 'results_last' if row_num == total else 'results'
+            yield [(value, style) for value in (form, student, subject, get_period_name(form, period), average,
+                                                recommended, actual)]
+
+    @staticmethod
+    def get_count_rows(title, counts):  # строки листа с количеством несовпадений
+        rows = [[(title, 'results_title'), ('Несовпадений', 'results_title')]]
+        for row in range(len(counts)):
+            style = 'results_last' if row == len(counts) - 1 else 'results'
+            rows.append([(counts[row][0], style), (counts[row][1], style)])
+        return rows
+
+    def save(self):
+        workbook = Workbook(write_only=True)  # строки пишутся по мере слияния, не собираясь в один список
+        add_report_styles(workbook)
+
+        subject_counts = []
+        write_sheet(workbook.create_sheet('Results'), self.get_results_rows(subject_counts), [],
+                    {'A': 10, 'B': 35, 'C': 25, 'D': 20})
+        write_sheet(workbook.create_sheet('По предметам'), self.get_count_rows('Предмет', subject_counts), [],
+                    {'A': 25, 'B': 15})
+        form_counts = [[form, len(mismatches)] for form, mismatches in self.forms]
+        write_sheet(workbook.create_sheet('По классам'), self.get_count_rows('Класс', form_counts), [],
+                    {'A': 10, 'B': 15})
+        workbook.save(self.filename)
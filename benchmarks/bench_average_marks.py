@@ -0,0 +1,58 @@
+# Сравнение скорости чтения файла со средними оценками:
+# старый способ (обращение к sheet[row] в цикле) и чтение за один проход iter_rows.
+# Запуск из корня репозитория: python -m benchmarks.bench_average_marks [кол-во строк]
+import os
+import sys
+import random
+import tempfile
+import time
+
+from openpyxl import load_workbook
+
+from analyser import ExcelMarksAnalyser
+from benchmarks.generator import create_average_file, get_subjects
+
+
+def legacy_get_average_marks(filename):  # прежний способ чтения (для сравнения)
+    workbook = load_workbook(filename, read_only=True)
+    sheet = workbook.active
+
+    students = {}
+    row_num = 7
+    while True:
+        if row_num > sheet.max_row:
+            break
+        row = list(map(lambda c: c.value, sheet[row_num]))
+        if row[0] in ('', None):
+            break
+        students[row[0]] = row[1:]
+        row_num += 1
+
+    workbook.close()
+    return students
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    random.seed(0)
+
+    with tempfile.TemporaryDirectory() as path:
+        filename = 'Средние баллы 5-А.xlsx'
+        create_average_file(os.path.join(path, filename), rows, get_subjects(10))
+
+        start_time = time.perf_counter()
+        legacy_get_average_marks(os.path.join(path, filename))
+        legacy_time = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        ExcelMarksAnalyser().get_average_marks(os.path.join(path, filename), '1')
+        new_time = time.perf_counter() - start_time
+
+    print('Строк: {}'.format(rows))
+    print('sheet[row] в цикле: {} сек.'.format(round(legacy_time, 3)))
+    print('iter_rows за один проход: {} сек.'.format(round(new_time, 3)))
+    print('Ускорение: {}x'.format(round(legacy_time / new_time, 1)))
+
+
+if __name__ == '__main__':
+    main()
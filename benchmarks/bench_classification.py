@@ -0,0 +1,71 @@
+# Сравнение скорости поэлементных get_needed_mark/classify и пакетных get_needed_marks/classify_all
+# (совпадение результатов проверяется в tests/test_marks.py).
+# Запуск из корня репозитория: python -m benchmarks.bench_classification [кол-во учеников]
+import sys
+import random
+import time
+
+from analyser import get_needed_mark, classify
+from marks import MarkStore, get_needed_marks, classify_all
+
+AVERAGE_MARKS = ['0', '0.0', '2.49', '2.5', '3.49', '3.5', '4.49', '4.5', '5', 'Н/А', 'Нзч', 'осв', None]
+FINAL_MARKS = ['2', '3', '4', '5', 'Н/А', 'Нзч', 'зач', None]
+
+
+def random_average():
+    if random.random() < 0.5:
+        return str(round(random.uniform(0, 5), random.randint(0, 3)))
+    return random.choice(AVERAGE_MARKS)
+
+
+def create_store(students, subjects):  # хранилище со случайными оценками за первый период
+    store = MarkStore()
+    for student in range(students):
+        student = store.add_student('Ученик {}'.format(student))
+        marks_count = random.randint(0, subjects)  # у части учеников почти нет оценок
+        for subject in range(subjects):
+            subject = store.add_subject('Предмет {}'.format(subject))
+            store.set_average(0, student, subject, random_average())
+            if subject < marks_count:
+                store.set_final(0, student, subject, random.choice(FINAL_MARKS))
+    return store
+
+
+def scalar_results(store):  # результаты прежних поэлементных функций (в тех же кодах)
+    recommended, classifications = [], []
+    for student in range(len(store.students)):
+        row = []
+        for code in store.get_averages(0)[student]:
+            row.append(store.encode(get_needed_mark(str(store.decode(code))), integer=True))
+        recommended.append(row)
+        marks = [str(store.decode(code, integer=True)) for code in store.get_finals(0)[student]]
+        classifications.append(classify(marks))
+    return recommended, classifications
+
+
+def batch_results(store):
+    return get_needed_marks(store.get_averages(0)).tolist(), classify_all(store.get_finals(0))
+
+
+def main():
+    students = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    random.seed(0)
+
+    store = create_store(students, 15)
+
+    start_time = time.perf_counter()
+    scalar_results(store)
+    scalar_time = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    batch_results(store)
+    batch_time = time.perf_counter() - start_time
+
+    print('Учеников: {}, предметов: 15'.format(students))
+    print('Поэлементно: {} сек.'.format(round(scalar_time, 3)))
+    print('Пакетно: {} сек.'.format(round(batch_time, 4)))
+    print('Ускорение: {}x'.format(round(scalar_time / batch_time, 1)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+# Сравнение последовательной обработки классов и обработки с записью файлов в фоновом потоке.
+# Задержка записи имитирует сетевую папку (файл пишется, затем поток ждёт указанное время).
+# Запуск из корня репозитория: python -m benchmarks.bench_pipeline [задержка записи, сек.] [классов в параллели]
+import os
+import sys
+import time
+import tempfile
+
+from analyser import ExcelMarksAnalyser, FinalMarksIndex, get_form_files, analyse_form_job, analyse_forms
+from benchmarks.generator import generate_school
+
+
+def add_save_latency(latency):  # задержка после каждой записи файла на диск
+    write_file = ExcelMarksAnalyser.write_file
+
+    def slow_write_file(analyser, filename, data):
+        write_file(analyser, filename, data)
+        time.sleep(latency)
+
+    ExcelMarksAnalyser.write_file = slow_write_file
+
+
+def main():
+    latency = float(sys.argv[1]) if len(sys.argv) > 1 else 0.2
+    forms_per_grade = int(sys.argv[2]) if len(sys.argv) > 2 else 2
+
+    with tempfile.TemporaryDirectory() as path:
+        filename, forms = generate_school(path, forms_per_grade)
+        form_files = get_form_files(filename)
+        out_path = os.path.join(path, 'out')
+        os.makedirs(out_path)
+        add_save_latency(latency)
+
+        start_time = time.perf_counter()
+        final_marks = FinalMarksIndex(filename)
+        for form in forms:
+            analyse_form_job(filename, form, '1', final_marks, out_path, form_files=form_files)
+        sequential_time = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        for _ in analyse_forms(filename, forms, '1', 1, out_path, form_files=form_files):
+            pass
+        pipeline_time = time.perf_counter() - start_time
+
+    print('Классов: {}, задержка записи: {} сек.'.format(len(forms), latency))
+    print('Последовательно: {} сек.'.format(round(sequential_time, 3)))
+    print('С записью в фоновом потоке: {} сек.'.format(round(pipeline_time, 3)))
+    print('Ускорение: {}x'.format(round(sequential_time / pipeline_time, 2)))
+
+
+if __name__ == '__main__':
+    main()
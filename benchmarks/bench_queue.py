@@ -0,0 +1,46 @@
+# Пропускная способность очереди заданий по нескольким школам в зависимости от количества процессов.
+# Запуск из корня репозитория: python -m benchmarks.bench_queue [школ] [классов в параллели] [процессов через запятую]
+import os
+import sys
+import time
+import tempfile
+
+from jobqueue import JobQueue, DONE, run_queue
+from benchmarks.generator import generate_school
+
+
+def main():
+    schools = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    forms_per_grade = int(sys.argv[2]) if len(sys.argv) > 2 else 2
+    if len(sys.argv) > 3:
+        worker_counts = [int(count) for count in sys.argv[3].split(',')]
+    else:
+        worker_counts = sorted({1, 2, os.cpu_count() or 1})
+
+    with tempfile.TemporaryDirectory() as path:
+        filenames = [generate_school(os.path.join(path, 'Школа {}'.format(index + 1)), forms_per_grade,
+                                     seed=index)[0] for index in range(schools)]
+        print('Школ: {}, процессоров: {}'.format(schools, os.cpu_count()))
+
+        base_time = None
+        for workers in worker_counts:
+            queue_filename = os.path.join(path, 'queue_{}.db'.format(workers))
+            jobs = JobQueue(queue_filename)
+            count = sum(jobs.add_school(filename, '1', out_path=os.path.join(path, 'out_{}'.format(workers)))
+                        for filename in filenames)
+            jobs.close()
+
+            start_time = time.perf_counter()
+            run_queue(queue_filename, workers)
+            duration = time.perf_counter() - start_time
+
+            jobs = JobQueue(queue_filename)
+            done = sum(row[2] for row in jobs.get_status()[1] if row[1] == DONE)
+            jobs.close()
+            base_time = base_time or duration
+            print('Процессов: {}, заданий: {} из {}, {} сек., {} классов/сек., ускорение {}x'.format(
+                workers, done, count, round(duration, 2), round(done / duration, 1), round(base_time / duration, 2)))
+
+
+if __name__ == '__main__':
+    main()
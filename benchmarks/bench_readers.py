@@ -0,0 +1,45 @@
+# Сравнение способов чтения входных файлов: openpyxl (режим только для чтения) и прямой разбор xml архива xlsx.
+# Запуск из корня репозитория: python -m benchmarks.bench_readers [классов в параллели] [учеников] [предметов]
+import sys
+import time
+import tempfile
+
+from analyser import FinalMarksIndex, get_form_files, read_average_marks
+from readers import ENGINES, LXML
+from benchmarks.generator import generate_school
+
+
+def main():
+    forms_per_grade = int(sys.argv[1]) if len(sys.argv) > 1 else 6
+    students = int(sys.argv[2]) if len(sys.argv) > 2 else 35
+    subjects = int(sys.argv[3]) if len(sys.argv) > 3 else 20
+
+    with tempfile.TemporaryDirectory() as path:
+        filename, forms = generate_school(path, forms_per_grade, students, subjects)
+        form_files = get_form_files(filename)
+
+        times, results = {}, {}
+        for engine in ENGINES:
+            start_time = time.perf_counter()
+            final_marks = FinalMarksIndex(filename, engine=engine).forms
+            final_time = time.perf_counter() - start_time
+
+            start_time = time.perf_counter()
+            average_marks = [read_average_marks(form_files.get(form), engine) for form in forms]
+            average_time = time.perf_counter() - start_time
+
+            times[engine] = (final_time, average_time)
+            results[engine] = (final_marks, average_marks)
+
+    print('Классов: {}, учеников в классе: {}, предметов: {}, lxml: {}'.format(len(forms), students, subjects,
+                                                                              'да' if LXML else 'нет'))
+    for engine in ENGINES:
+        print('{}: итоговые оценки {} сек., средние баллы {} сек.'.format(engine, round(times[engine][0], 3),
+                                                                          round(times[engine][1], 3)))
+    print('Ускорение: итоговые оценки {}x, средние баллы {}x'.format(
+        round(times['openpyxl'][0] / times['xml'][0], 1), round(times['openpyxl'][1] / times['xml'][1], 1)))
+    print('Результаты совпадают: {}'.format('да' if results['xml'] == results['openpyxl'] else 'НЕТ'))
+
+
+if __name__ == '__main__':
+    main()
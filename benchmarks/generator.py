@@ -0,0 +1,115 @@
+# Генерация синтетических входных файлов школы: файл с итоговыми оценками (лист на параллель)
+# и файлы со средними оценками для каждого класса.
+# Запуск из корня репозитория: python -m benchmarks.generator папка [--forms-per-grade N] [--students N] [--subjects N]
+import os
+import random
+import argparse
+
+from openpyxl import Workbook
+
+SUBJECTS = ['Математика', 'Русский язык', 'Литература', 'История', 'Физика', 'Химия', 'Биология', 'География',
+            'Английский язык', 'Информатика', 'Обществознание', 'Физкультура', 'Музыка', 'ИЗО', 'Технология',
+            'ОБЖ', 'Астрономия', 'Немецкий язык', 'Алгебра', 'Геометрия']
+LETTERS = 'АБВГДЕЖИКЛМН'
+GRADES = range(5, 12)
+
+AVERAGE_MARKS = ['2.4', '3.49', '3.5', '4.49', '4.5', '5', '0', 'Н/А', 'Нзч', None]
+FINAL_MARKS = ['5', '5', '4', '4', '4', '3', '3', '2', 'Н/А', 'Нзч', None]
+
+FINAL_FILENAME = 'Итоговые оценки.xlsx'
+
+
+def get_subjects(count):  # названия предметов (при нехватке добавляются нумерованные)
+    return [SUBJECTS[i] if i < len(SUBJECTS) else 'Предмет {}'.format(i + 1) for i in range(count)]
+
+
+def get_periods(grade):  # названия столбцов итоговых оценок параллели
+    if grade in (10, 11):
+        return ['Первое полугодие', 'Второе полугодие', 'Год']
+    return ['1 триместр', '2 триместр', '3 триместр', 'Год']
+
+
+def get_student_name(form, index):  # полное имя ученика (в файле со средними оценками - первые два слова)
+    return 'Фамилия{}_{} Имя{} Отчество{}'.format(form, index, index % 17, index % 5)
+
+
+def create_average_file(filename, students, subjects, form='5-А'):  # файл со средними оценками класса
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet['A1'] = 'Средние баллы'
+    sheet.cell(row=6, column=1, value='Ученик')
+    for col in range(len(subjects)):
+        sheet.cell(row=6, column=col + 2, value=subjects[col])
+
+    for row in range(students):
+        sheet.cell(row=row + 7, column=1, value=' '.join(get_student_name(form, row).split()[:2]))
+        for col in range(len(subjects)):
+            sheet.cell(row=row + 7, column=col + 2, value=random.choice(AVERAGE_MARKS))
+
+    workbook.save(filename)
+
+
+def add_final_block(sheet, row, form, students, subjects):  # блок класса на листе итоговых оценок,
+    # возвращает номер строки после блока
+    periods = get_periods(int(form.split('-')[0]))
+
+    sheet.cell(row=row, column=2, value=form)
+    sheet.cell(row=row + 1, column=2, value='Итоговые оценки')
+    col = 2
+    for subject in subjects:
+        sheet.cell(row=row + 2, column=col, value=subject)
+        sheet.merge_cells(start_row=row + 2, start_column=col, end_row=row + 2, end_column=col + len(periods) - 1)
+        for period in periods:
+            sheet.cell(row=row + 3, column=col, value=period)
+            col += 1
+
+    for student in range(students):
+        sheet.cell(row=row + 4 + student, column=1, value=get_student_name(form, student))
+        for mark_col in range(2, col):
+            mark = random.choice(FINAL_MARKS)
+            if mark is not None:
+                sheet.cell(row=row + 4 + student, column=mark_col, value=mark)
+
+    return row + 4 + students + 2
+
+
+def generate_school(path, forms_per_grade=3, students=25, subjects=10, seed=0):  # генерация файлов школы,
+    # возвращает путь к файлу с итоговыми оценками и список классов
+    random.seed(seed)
+    os.makedirs(path, exist_ok=True)
+    subject_names = get_subjects(subjects)
+
+    workbook = Workbook()
+    workbook.remove(workbook.active)
+    forms = []
+    for grade in GRADES:
+        sheet = workbook.create_sheet(str(grade))
+        sheet['A1'] = 'Итоговые оценки {} классов'.format(grade)
+        row = 3
+        for letter in LETTERS[:forms_per_grade]:
+            form = '{}-{}'.format(grade, letter)
+            forms.append(form)
+            row = add_final_block(sheet, row, form, students, subject_names)
+            create_average_file(os.path.join(path, 'Средние баллы {}.xlsx'.format(form)), students, subject_names,
+                                form)
+
+    filename = os.path.join(path, FINAL_FILENAME)
+    workbook.save(filename)
+    return filename, forms
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Генерация синтетических файлов школы')
+    parser.add_argument('path', help='папка для файлов')
+    parser.add_argument('--forms-per-grade', type=int, default=3, help='количество классов в параллели')
+    parser.add_argument('--students', type=int, default=25, help='количество учеников в классе')
+    parser.add_argument('--subjects', type=int, default=10, help='количество предметов')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    filename, forms = generate_school(args.path, args.forms_per_grade, args.students, args.subjects, args.seed)
+    print('Создан файл "{}" и файлы со средними оценками для {} классов.'.format(filename, len(forms)))
+
+
+if __name__ == '__main__':
+    main()
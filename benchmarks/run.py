@@ -0,0 +1,166 @@
+# Замеры скорости отдельных этапов обработки на синтетических файлах школы
+# (чтение средних баллов, чтение итоговых оценок, оценка успеваемости, запись отчётов xlsx и таблиц csv,
+# обработка целиком).
+# Результаты сохраняются в JSON и могут сравниваться с результатами другой версии.
+# Запуск из корня репозитория: python -m benchmarks.run [--output results.json] [--compare прежние.json]
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import tempfile
+import subprocess
+
+from analyser import ExcelMarksAnalyser, FinalMarksIndex, get_form_files, read_average_marks, analyse_forms
+from readers import ENGINES, get_engine
+from benchmarks.generator import generate_school
+
+RESULTS_VERSION = 1  # меняется при изменении формата файла результатов
+
+
+def get_revision():  # текущая версия кода (коммит), если доступна
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], stderr=subprocess.DEVNULL,
+                                       cwd=os.path.dirname(os.path.abspath(__file__))).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def measure(stage, repeat, setup=None):  # время выполнения этапа (setup выполняется перед каждым замером без учёта)
+    times = []
+    for _ in range(repeat):
+        data = setup() if setup is not None else None
+        start_time = time.perf_counter()
+        stage(data)
+        times.append(time.perf_counter() - start_time)
+    return {'best': min(times), 'mean': sum(times) / len(times), 'times': times}
+
+
+def load_analysers(filename, forms, form_files, period):  # анализаторы с прочитанными данными всех классов
+    final_marks = FinalMarksIndex(filename)
+    analysers = {}
+    for form in forms:
+        analysers[form] = ExcelMarksAnalyser()
+        analysers[form].get_average_marks(form_files.get(form), period)
+        analysers[form].get_final_marks(filename, form, final_marks)
+    return analysers
+
+
+def run_benchmarks(path, args):  # замеры всех этапов, возвращает словарь с результатами
+    filename, forms = generate_school(path, args.forms_per_grade, args.students, args.subjects, args.seed)
+    form_files = get_form_files(filename)
+    out_path = os.path.join(path, 'out')
+    os.makedirs(out_path, exist_ok=True)
+
+    def parse_averages(data):
+        for form in forms:
+            read_average_marks(form_files.get(form))
+
+    def parse_finals(data):
+        FinalMarksIndex(filename)
+
+    def classify(analysers):
+        for form, analyser in analysers.items():
+            analyser.classify_students(form, args.period)
+
+    def write_reports(analysers):
+        for form, analyser in analysers.items():
+            workbook = analyser.build_resulting_file(form, args.period)[0]
+            analyser.save_resulting_file(workbook, os.path.join(out_path, '{}.xlsx'.format(form)))
+
+    def write_tables(analysers):
+        for form, analyser in analysers.items():
+            analyser.save_export_files(analyser.get_tables(form, args.period), os.path.join(out_path, form), 'csv')
+
+    def prepare_reports():
+        analysers = load_analysers(filename, forms, form_files, args.period)
+        classify(analysers)
+        return analysers
+
+    def process(data):
+        for result in analyse_forms(filename, forms, args.period, args.jobs, out_path, form_files=form_files):
+            if result['error'] is not None:
+                raise RuntimeError('{}: {}'.format(result['form'], result['error']))
+
+    stages = {}
+    stages['average_parsing'] = measure(parse_averages, args.repeat)
+    stages['final_parsing'] = measure(parse_finals, args.repeat)
+    stages['classification'] = measure(classify, args.repeat,
+                                       lambda: load_analysers(filename, forms, form_files, args.period))
+    stages['report_writing'] = measure(write_reports, args.repeat, prepare_reports)
+    stages['csv_writing'] = measure(write_tables, args.repeat, prepare_reports)
+    stages['pipeline'] = measure(process, args.repeat)
+
+    return {
+        'version': RESULTS_VERSION,
+        'revision': get_revision(),
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'parameters': {'forms': len(forms), 'forms_per_grade': args.forms_per_grade, 'students': args.students,
+                       'subjects': args.subjects, 'period': args.period, 'jobs': args.jobs, 'repeat': args.repeat,
+                       'seed': args.seed, 'reader': get_engine()},
+        'stages': stages,
+    }
+
+
+def compare_results(results, previous, threshold):  # сравнение с прежними результатами, возвращает список
+    # этапов, замедлившихся больше чем на threshold (доля)
+    if previous.get('parameters') != results['parameters']:
+        print('Внимание: параметры замеров отличаются от прежних, сравнение может быть некорректным.')
+
+    regressions = []
+    print('{:<18}{:>12}{:>12}{:>10}'.format('Этап', 'Было, сек.', 'Стало, сек.', 'Изм., %'))
+    for stage, result in results['stages'].items():
+        if stage not in previous.get('stages', {}):
+            continue
+        old, new = previous['stages'][stage]['best'], result['best']
+        change = (new - old) / old if old > 0 else 0
+        print('{:<18}{:>12.3f}{:>12.3f}{:>+10.1f}'.format(stage, old, new, change * 100))
+        if change > threshold:
+            regressions.append(stage)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Замеры скорости этапов обработки')
+    parser.add_argument('--forms-per-grade', type=int, default=3, help='количество классов в параллели')
+    parser.add_argument('--students', type=int, default=25, help='количество учеников в классе')
+    parser.add_argument('--subjects', type=int, default=10, help='количество предметов')
+    parser.add_argument('--period', default='1', choices=['1', '2', '3', 'Год', 'Все'])
+    parser.add_argument('--jobs', type=int, default=1, help='количество процессов при обработке целиком')
+    parser.add_argument('--repeat', type=int, default=3, help='количество повторов каждого замера')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='файл для сохранения результатов (JSON)')
+    parser.add_argument('--compare', help='файл с прежними результатами (JSON) для сравнения')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='допустимое замедление этапа при сравнении (доля, по умолчанию 0.2)')
+    parser.add_argument('--reader', choices=ENGINES, help='способ чтения входных файлов')
+    args = parser.parse_args()
+    if args.reader:
+        os.environ['EXCEL_MARKS_READER'] = args.reader
+
+    with tempfile.TemporaryDirectory() as path:
+        results = run_benchmarks(path, args)
+
+    print('{:<18}{:>12}{:>12}'.format('Этап', 'Лучшее', 'Среднее'))
+    for stage, result in results['stages'].items():
+        print('{:<18}{:>12.3f}{:>12.3f}'.format(stage, result['best'], result['mean']))
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump(results, file, ensure_ascii=False, indent=2)
+        print('Результаты сохранены в "{}".'.format(args.output))
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as file:
+            previous = json.load(file)
+        regressions = compare_results(results, previous, args.threshold)
+        if regressions:
+            print('Замедление больше {}%: {}.'.format(round(args.threshold * 100), ', '.join(regressions)))
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
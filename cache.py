@@ -0,0 +1,87 @@
+import os
+import time
+import zlib
+import pickle
+import hashlib
+
+CACHE_VERSION = 2  # меняется при изменении формата прочитанных данных
+
+
+def get_default_cache_path():  # папка кэша по умолчанию
+    if os.environ.get('EXCEL_MARKS_CACHE'):
+        return os.environ['EXCEL_MARKS_CACHE']
+    return os.path.join(os.path.expanduser('~'), '.cache', 'excel_marks')
+
+
+def get_file_hash(filename):  # хэш содержимого файла
+    file_hash = hashlib.sha1()
+    with open(filename, 'rb') as file:
+        for block in iter(lambda: file.read(1 << 20), b''):
+            file_hash.update(block)
+    return file_hash.hexdigest()
+
+
+class ParseCache:  # кэш прочитанных файлов на диске (ключ - путь, размер, время изменения и хэш содержимого)
+    def __init__(self, path=None, max_size=200 * 1024 * 1024, max_age=30 * 24 * 60 * 60):
+        self.path = path or get_default_cache_path()
+        self.max_size = max_size  # максимальный размер кэша в байтах
+        self.max_age = max_age  # максимальное время хранения записи без обращений в секундах
+
+    def get_key(self, kind, filename):  # метод для получения ключа записи по отпечатку файла
+        stat = os.stat(filename)
+        fingerprint = '{}|{}|{}|{}|{}|{}'.format(CACHE_VERSION, kind, os.path.abspath(filename), stat.st_size,
+                                                 stat.st_mtime_ns, get_file_hash(filename))
+        return hashlib.sha1(fingerprint.encode('utf-8')).hexdigest()
+
+    def get(self, kind, filename, read):  # метод для получения прочитанных данных (при отсутствии - read(filename))
+        entry = os.path.join(self.path, '{}.cache'.format(self.get_key(kind, filename)))
+
+        try:
+            with open(entry, 'rb') as file:
+                data = pickle.loads(zlib.decompress(file.read()))
+            os.utime(entry)  # отмечаем обращение для вытеснения давно не использованных записей
+            return data
+        except (OSError, EOFError, zlib.error, pickle.UnpicklingError):
+            pass
+
+        data = read(filename)
+
+        try:  # запись во временный файл и переименование, чтобы параллельные процессы не читали недописанный файл
+            os.makedirs(self.path, exist_ok=True)
+            temp_entry = '{}.{}.tmp'.format(entry, os.getpid())
+            with open(temp_entry, 'wb') as file:
+                file.write(zlib.compress(pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL)))
+            os.replace(temp_entry, entry)
+            self.evict()
+        except OSError:  # без кэша обработка всё равно выполняется
+            pass
+
+        return data
+
+    def evict(self):  # удаление устаревших записей и самых давно использованных при превышении размера
+        entries = []
+        for name in os.listdir(self.path):
+            if not name.endswith('.cache'):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.path, name))
+            except OSError:  # запись уже удалена другим процессом
+                continue
+            entries.append((stat.st_mtime, stat.st_size, name))
+        entries.sort()
+
+        total_size = sum(entry[1] for entry in entries)
+        for modified, size, name in entries:
+            if time.time() - modified <= self.max_age and total_size <= self.max_size:
+                break
+            try:
+                os.remove(os.path.join(self.path, name))
+            except OSError:
+                continue
+            total_size -= size
+
+    def clear(self):  # удаление всех записей
+        if os.path.isdir(self.path):
+            for name in os.listdir(self.path):
+                if name.endswith('.cache'):
+                    os.remove(os.path.join(self.path, name))
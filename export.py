@@ -0,0 +1,57 @@
+import csv
+
+try:  # запись в формате Parquet необязательна
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+OUTPUT_FORMATS = ['xlsx', 'csv', 'parquet']
+
+TABLES = {  # таблицы результата: название -> столбцы
+    'marks': ['form', 'period', 'student', 'subject', 'average', 'recommended', 'actual', 'wrong'],
+    'classifications': ['form', 'period', 'student', 'classification'],
+    'results': ['form', 'period', 'student', 'subject', 'average', 'recommended', 'actual'],
+}
+
+
+def check_output_format(output_format):  # проверка возможности записи в формате, возвращает текст ошибки
+    if output_format == 'parquet' and pyarrow is None:
+        return 'Для записи в формате Parquet нужен пакет pyarrow'
+    return None
+
+
+def get_export_filenames(base_filename, output_format):  # файлы таблиц результата по названиям таблиц
+    return {name: '{}_{}.{}'.format(base_filename, name, output_format) for name in TABLES.keys()}
+
+
+def write_csv(filename, columns, rows):
+    with open(filename, 'w', encoding='utf-8', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(columns)
+        writer.writerows(rows)
+
+
+def write_parquet(filename, columns, rows):
+    arrays = []
+    for index in range(len(columns)):
+        values = [row[index] for row in rows]
+        try:
+            arrays.append(pyarrow.array(values))
+        except (pyarrow.ArrowInvalid, pyarrow.ArrowTypeError):  # числа вперемешку с 'Н/А', 'Нзч' - в строки
+            arrays.append(pyarrow.array([None if value is None else str(value) for value in values],
+                                        pyarrow.string()))
+    pyarrow.parquet.write_table(pyarrow.Table.from_arrays(arrays, names=columns), filename)
+
+
+def write_tables(tables, base_filename, output_format='csv'):
+    # запись таблиц результата в CSV или Parquet, возвращает имя файла с таблицей оценок
+    error = check_output_format(output_format)
+    if error:
+        raise ValueError(error)
+    write = write_parquet if output_format == 'parquet' else write_csv
+
+    filenames = get_export_filenames(base_filename, output_format)
+    for name, columns in TABLES.items():
+        write(filenames[name], columns, tables[name])
+    return filenames['marks']
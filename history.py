@@ -0,0 +1,151 @@
+import sqlite3
+import datetime
+
+from analyser import get_form_periods
+from marks import get_period_index
+
+SCHEMA_VERSION = 1
+
+CLASSIFICATION_RANKS = {  # порядок оценок успеваемости от худшей к лучшей (для поиска ухудшений)
+    'Есть неаттестации': 0,
+    'Есть незачёты': 1,
+    'Двоечник': 2,
+    'Троечник': 3,
+    'С одной 3': 4,
+    'Хорошист': 5,
+    'С одной 4': 6,
+    'Отличник': 7,
+}
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS marks (
+    year TEXT NOT NULL,
+    form TEXT NOT NULL,
+    period TEXT NOT NULL,
+    period_index INTEGER NOT NULL,
+    student TEXT NOT NULL,
+    subject TEXT NOT NULL,
+    average,
+    recommended,
+    actual,
+    wrong INTEGER NOT NULL,
+    PRIMARY KEY (year, form, period, student, subject)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS marks_student ON marks (student, year, period_index);
+CREATE INDEX IF NOT EXISTS marks_subject ON marks (subject, year, period);
+CREATE INDEX IF NOT EXISTS marks_wrong ON marks (year, period, wrong, form);
+
+CREATE TABLE IF NOT EXISTS classifications (
+    year TEXT NOT NULL,
+    form TEXT NOT NULL,
+    period TEXT NOT NULL,
+    period_index INTEGER NOT NULL,
+    student TEXT NOT NULL,
+    classification TEXT NOT NULL,
+    rank INTEGER,
+    PRIMARY KEY (year, form, student, period_index)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS classifications_period ON classifications (year, period, form);
+CREATE INDEX IF NOT EXISTS classifications_student ON classifications (student, year, period_index);
+'''
+
+
+def get_school_year(date=None):  # учебный год по дате ("2025/2026" с сентября 2025 по август 2026)
+    date = date or datetime.date.today()
+    start = date.year if date.month >= 9 else date.year - 1
+    return '{}/{}'.format(start, start + 1)
+
+
+class HistoryStore:  # база оценок и оценок успеваемости всех обработанных классов за разные периоды и годы
+    def __init__(self, filename):
+        self.filename = filename
+        self.connection = sqlite3.connect(filename)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+
+        version = self.connection.execute('PRAGMA user_version').fetchone()[0]
+        if version not in (0, SCHEMA_VERSION):
+            raise ValueError('Неподдерживаемая версия базы "{}": {}'.format(filename, version))
+        with self.connection:
+            self.connection.executescript(SCHEMA)
+            self.connection.execute('PRAGMA user_version = {}'.format(SCHEMA_VERSION))
+
+    def close(self):
+        self.connection.close()
+
+    def add_form(self, analyser, form, period, year=None):  # метод для сохранения данных класса одной транзакцией
+        # (прежние данные класса за те же периоды заменяются)
+        year = year or get_school_year()
+        marks = analyser.marks
+        mark_rows, classification_rows = [], []
+
+        for form_period in get_form_periods(form, period):
+            period_index = get_period_index(form_period)
+            averages, recommended, finals, wrong = analyser.get_period_marks(form_period)
+
+            for student_index, student in enumerate(marks.students):
+                for subject_index, subject in enumerate(marks.subjects):
+                    mark_rows.append((year, form, form_period, period_index, student, subject,
+                                      marks.decode(averages[student_index, subject_index]),
+                                      marks.decode(recommended[student_index, subject_index], integer=True),
+                                      marks.decode(finals[student_index, subject_index], integer=True),
+                                      int(wrong[student_index, subject_index])))
+
+                classification = analyser.classifications[form_period][student]
+                classification_rows.append((year, form, form_period, period_index, student, classification,
+                                            CLASSIFICATION_RANKS.get(classification)))
+
+        with self.connection:  # одна транзакция на класс
+            for form_period in get_form_periods(form, period):
+                self.connection.execute('DELETE FROM marks WHERE year = ? AND form = ? AND period = ?',
+                                        (year, form, form_period))
+                self.connection.execute('DELETE FROM classifications WHERE year = ? AND form = ? AND period = ?',
+                                        (year, form, form_period))
+            self.connection.executemany('INSERT INTO marks VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', mark_rows)
+            self.connection.executemany('INSERT INTO classifications VALUES (?, ?, ?, ?, ?, ?, ?)',
+                                        classification_rows)
+
+    def query(self, sql, parameters=()):  # метод для выполнения запроса, возвращает названия столбцов и строки
+        cursor = self.connection.execute(sql, parameters)
+        return [column[0] for column in cursor.description], cursor.fetchall()
+
+    def get_mismatches(self, year, period, form=None, subject=None, student=None):
+        # оценки, не совпадающие с рекомендуемыми
+        sql = 'SELECT form, student, subject, period, average, recommended, actual FROM marks ' \
+              'WHERE year = ? AND period = ? AND wrong = 1'
+        parameters = [year, period]
+        for column, value in (('form', form), ('subject', subject), ('student', student)):
+            if value is not None:
+                sql += ' AND {} = ?'.format(column)
+                parameters.append(value)
+        return self.query(sql + ' ORDER BY form, subject, student', parameters)
+
+    def get_classifications(self, year, period, form=None):  # оценки успеваемости учеников за период
+        sql = 'SELECT form, student, classification FROM classifications WHERE year = ? AND period = ?'
+        parameters = [year, period]
+        if form is not None:
+            sql += ' AND form = ?'
+            parameters.append(form)
+        return self.query(sql + ' ORDER BY form, student', parameters)
+
+    def get_classification_drops(self, year, period, form=None):
+        # ученики, оценка успеваемости которых ухудшилась по сравнению с предыдущим сохранённым периодом года
+        sql = 'SELECT cur.form, cur.student, prev.period AS previous_period, ' \
+              'prev.classification AS previous_classification, cur.period, cur.classification ' \
+              'FROM classifications AS cur JOIN classifications AS prev ' \
+              'ON prev.year = cur.year AND prev.form = cur.form AND prev.student = cur.student ' \
+              'AND prev.period_index = (SELECT MAX(period_index) FROM classifications ' \
+              'WHERE year = cur.year AND form = cur.form AND student = cur.student ' \
+              'AND period_index < cur.period_index) ' \
+              'WHERE cur.year = ? AND cur.period = ? AND cur.rank < prev.rank'
+        parameters = [year, period]
+        if form is not None:
+            sql += ' AND cur.form = ?'
+            parameters.append(form)
+        return self.query(sql + ' ORDER BY cur.form, cur.student', parameters)
+
+    def get_student_history(self, student, subject=None):  # итоговые оценки ученика за все периоды и годы
+        if subject is None:
+            return self.query('SELECT year, form, period, classification FROM classifications WHERE student = ? '
+                              'ORDER BY year, period_index', (student,))
+        return self.query('SELECT year, form, period, average, recommended, actual FROM marks '
+                          'WHERE student = ? AND subject = ? ORDER BY year, period_index', (student, subject))
@@ -0,0 +1,257 @@
+import os
+import multiprocessing
+
+from PyQt5.QtWidgets import QWidget, QFileDialog, QPushButton, QLineEdit, QTextEdit, QLabel, QGridLayout,\
+    QComboBox, QProgressBar, QSpinBox, QCheckBox
+from PyQt5.QtCore import Qt, QObject, QRunnable, QThreadPool, pyqtSignal
+from PyQt5.QtGui import QFont
+
+from analyser import ALL_PERIODS, check_form, get_collision_error, get_form_files, analyse_forms
+from cache import ParseCache
+from stats import BatchStats
+from manifest import Manifest
+
+
+class AnalysisSignals(QObject):  # сигналы для передачи хода обработки из фонового потока в интерфейс
+    message = pyqtSignal(str)
+    progress = pyqtSignal(int, int)
+    finished = pyqtSignal()
+
+
+class AnalysisTask(QRunnable):  # фоновая задача обработки одного или нескольких классов
+    def __init__(self, filename, forms, period, jobs=1, form_files=None, incremental=False):
+        super().__init__()
+        self.filename = filename
+        self.forms = forms
+        self.period = period
+        self.jobs = jobs
+        self.form_files = form_files
+        self.incremental = incremental  # пропускать классы, входные данные которых не изменились
+        self.cancelled = False
+        self.stats = BatchStats()  # замеры этапов обработки
+        self.signals = AnalysisSignals()
+
+    def cancel(self):  # отмена обработки (текущий класс дорабатывается до конца)
+        self.cancelled = True
+
+    def run(self):
+        try:
+            # задача выполняется в потоке пула Qt: процессы запускаются заново (spawn), а не копируются через
+            # fork вместе с состоянием Qt и блокировками других потоков
+            results = analyse_forms(self.filename, self.forms, self.period, self.jobs, cache=ParseCache(),
+                                    form_files=self.form_files, stats=self.stats,
+                                    manifest=Manifest() if self.incremental else None,
+                                    mp_context=multiprocessing.get_context('spawn'))
+            for form_index, result in enumerate(results):
+                if result['error'] is not None:
+                    self.signals.message.emit('Ошибка: {} ({}).\n'.format(result['error'], result['form']))
+                elif result['skipped']:
+                    self.signals.message.emit('Без изменений: "{}" ({}).\n'.format(result['filename'], result['form']))
+                else:
+                    self.signals.message.emit('Успешно обработано: "{}" ({}).\n'.format(self.filename, result['form']) +
+                                              'Файл "{}" успешно создан.\n'.format(result['filename']) +
+                                              'Длительность выполнения: {} сек.\n'.format(
+                                                  str(round(result['duration'], 2))))
+                self.signals.progress.emit(form_index + 1, len(self.forms))
+
+                if self.cancelled and form_index + 1 < len(self.forms):
+                    results.close()
+                    self.signals.message.emit('Обработка отменена.\n')
+                    return
+
+            if len(self.forms) > 1:
+                self.signals.message.emit('Обработка файлов завершена.\n')
+            self.signals.message.emit('<pre>{}</pre>'.format(self.stats.format_table()))
+
+        except Exception as e:
+            self.signals.message.emit('Ошибка: {}.\n'.format(e))
+        finally:
+            self.signals.finished.emit()
+
+
+class ExcelMarksInterface(QWidget):
+    def __init__(self):
+        super().__init__()
+        self.needed_file_description, self.select_file_button, self.selected_file_label, self.period_label,\
+            self.period_input, self.form_data_description, self.form_input, self.start_analysing_button,\
+            self.or_label, self.incremental_input, self.start_analysing_all_button, self.jobs_input, self.progress_bar,\
+            self.cancel_button, self.output_console = [None] * 15
+        self.init_ui()
+        self.filename = None
+        self.task = None
+        self.show()
+
+    def init_ui(self):
+        self.setFixedSize(800, 600)
+        self.setWindowTitle('Обработка оценок учеников')
+
+        grid = QGridLayout()
+        grid.setContentsMargins(40, 20, 40, 30)
+        grid.setSpacing(15)
+        self.setLayout(grid)
+
+        self.needed_file_description = QLabel('Выберите файл с итоговыми оценками:', self)
+        self.needed_file_description.setFont(QFont('Arial', 13))
+        grid.addWidget(self.needed_file_description, 0, 0, 1, 3, alignment=Qt.AlignCenter)
+
+        self.select_file_button = QPushButton('Выбрать файл', self)
+        self.select_file_button.setFont(QFont('Arial', 13))
+        self.select_file_button.clicked.connect(self.select_file)
+        self.select_file_button.setFixedSize(150, 40)
+        grid.addWidget(self.select_file_button, 1, 0, alignment=Qt.AlignCenter)
+
+        self.selected_file_label = QLabel('Файл не выбран.', self)
+        self.selected_file_label.setFont(QFont('Arial', 13))
+        grid.addWidget(self.selected_file_label, 1, 1, 1, 2)
+
+        self.period_label = QLabel('Период аттестации (триместр/полугодие/год):', self)
+        self.period_label.setFont(QFont('Arial', 13))
+        grid.addWidget(self.period_label, 2, 0, 1, 2, alignment=Qt.AlignCenter)
+
+        self.period_input = QComboBox(self)
+        self.period_input.addItems(['1', '2', '3', 'Год', ALL_PERIODS])
+        self.period_input.setFont(QFont('Arial', 14))
+        grid.addWidget(self.period_input, 2, 2, alignment=Qt.AlignCenter)
+
+        self.form_data_description = QLabel('Название класса (разделяя номер и букву дефисом):', self)
+        self.form_data_description.setFont(QFont('Arial', 13))
+        grid.addWidget(self.form_data_description, 3, 0, 1, 2, alignment=Qt.AlignCenter)
+
+        self.form_input = QLineEdit('', self)
+        self.form_input.setFont(QFont('Arial', 14))
+        self.form_input.setMaximumWidth(150)
+        grid.addWidget(self.form_input, 3, 2, alignment=Qt.AlignCenter)
+
+        self.start_analysing_button = QPushButton('Обработать', self)
+        self.start_analysing_button.setFont(QFont('Arial', 13))
+        self.start_analysing_button.clicked.connect(self.analyse)
+        self.start_analysing_button.setAutoDefault(True)
+        self.start_analysing_button.setFixedSize(200, 50)
+        grid.addWidget(self.start_analysing_button, 4, 0, 1, 3, alignment=Qt.AlignCenter)
+
+        self.or_label = QLabel('ИЛИ', self)
+        self.or_label.setFont(QFont('Arial', 13))
+        grid.addWidget(self.or_label, 5, 0, 1, 2, alignment=Qt.AlignCenter)
+
+        self.incremental_input = QCheckBox('Только изменённые', self)  # пропуск классов без изменений
+        self.incremental_input.setFont(QFont('Arial', 13))
+        grid.addWidget(self.incremental_input, 5, 2, alignment=Qt.AlignCenter)
+
+        self.start_analysing_all_button = QPushButton('Обработать все файлы в папке')
+        self.start_analysing_all_button.setFont(QFont('Arial', 13))
+        self.start_analysing_all_button.clicked.connect(self.analyse_all)
+        self.start_analysing_all_button.setFixedSize(300, 50)
+        grid.addWidget(self.start_analysing_all_button, 6, 0, 1, 2, alignment=Qt.AlignCenter)
+
+        self.jobs_input = QSpinBox(self)  # количество процессов для обработки всех файлов в папке
+        self.jobs_input.setFont(QFont('Arial', 13))
+        self.jobs_input.setPrefix('Процессов: ')
+        self.jobs_input.setRange(1, os.cpu_count() or 1)
+        self.jobs_input.setValue(os.cpu_count() or 1)
+        grid.addWidget(self.jobs_input, 6, 2, alignment=Qt.AlignCenter)
+
+        self.progress_bar = QProgressBar(self)
+        self.progress_bar.setFont(QFont('Arial', 12))
+        self.progress_bar.setValue(0)
+        grid.addWidget(self.progress_bar, 7, 0, 1, 2)
+
+        self.cancel_button = QPushButton('Отменить', self)
+        self.cancel_button.setFont(QFont('Arial', 13))
+        self.cancel_button.clicked.connect(self.cancel)
+        self.cancel_button.setFixedSize(150, 40)
+        self.cancel_button.setEnabled(False)
+        grid.addWidget(self.cancel_button, 7, 2, alignment=Qt.AlignCenter)
+
+        self.output_console = QTextEdit('', self)
+        self.output_console.setFont(QFont('Arial', 12))
+        self.output_console.setReadOnly(True)
+        self.output_console.setMaximumHeight(300)
+        grid.addWidget(self.output_console, 8, 0, 1, 3)
+
+    def select_file(self):  # метод для отображения окна выбора файла
+        filename = QFileDialog.getOpenFileName(self, 'Выбор файла для обработки')[0]
+        if filename == '':
+            self.selected_file_label.setText('Файл не выбран.')
+        else:
+            self.filename = filename
+            self.selected_file_label.setText('Выбранный файл: "{}".'.format(filename.split('/')[-1]))
+
+    def check_file(self):  # метод для проверки выбранного файла
+        if self.filename in (None, ''):  # проверка на то, что файл не выбран
+            self.output_console.append('Ошибка: Файл не выбран.\n')
+            return False
+        if not self.filename.endswith('.xlsx'):  # проверка на расширение файла
+            self.output_console.append('Ошибка: Неподдерживаемое расширение файла: "{}".\n'.
+                                       format(self.filename.split('.')[-1]))
+            return False
+        return True
+
+    def analyse(self):  # метод для обработки файла
+        if self.task is not None or not self.check_file():
+            return
+
+        form = self.form_input.text().upper()
+        period = self.period_input.currentText()
+
+        error = check_form(form, period)
+        if error:
+            self.output_console.append('Ошибка: {}.\n'.format(error))
+            return
+
+        self.start_task(AnalysisTask(self.filename, [form], period, incremental=self.incremental_input.isChecked()))
+
+    def analyse_all(self):
+        if self.task is not None or not self.check_file():
+            return
+
+        period = self.period_input.currentText()
+
+        form_files = get_form_files(self.filename)  # папка просматривается один раз для всех классов
+        forms = form_files.forms()
+        if len(forms) == 0:
+            self.output_console.append('Ошибка: Файлы со средними оценками не найдены.\n')
+            return
+
+        collisions = form_files.collisions()  # о классах с несколькими файлами сообщается один раз до обработки
+        for form, files in collisions.items():
+            self.output_console.append('Ошибка: {} ({}).\n'.format(get_collision_error(form, files), form))
+        forms = [form for form in forms if form not in collisions.keys()]
+        if len(forms) == 0:
+            return
+
+        self.start_task(AnalysisTask(self.filename, forms, period, self.jobs_input.value(), form_files,
+                                     self.incremental_input.isChecked()))
+
+    def start_task(self, task):  # метод для запуска обработки в фоновом потоке
+        self.task = task
+        self.task.signals.message.connect(self.output_console.append)
+        self.task.signals.progress.connect(self.show_progress)
+        self.task.signals.finished.connect(self.task_finished)
+
+        self.progress_bar.setMaximum(len(task.forms))
+        self.progress_bar.setValue(0)
+        self.start_analysing_button.setEnabled(False)
+        self.start_analysing_all_button.setEnabled(False)
+        self.cancel_button.setEnabled(True)
+
+        QThreadPool.globalInstance().start(self.task)
+
+    def show_progress(self, done, total):
+        self.progress_bar.setMaximum(total)
+        self.progress_bar.setValue(done)
+
+    def cancel(self):  # метод для отмены текущей обработки
+        if self.task is not None:
+            self.task.cancel()
+            self.cancel_button.setEnabled(False)
+
+    def task_finished(self):
+        self.task = None
+        self.start_analysing_button.setEnabled(True)
+        self.start_analysing_all_button.setEnabled(True)
+        self.cancel_button.setEnabled(False)
+
+    def closeEvent(self, event):  # при закрытии окна дожидаемся окончания текущего класса
+        self.cancel()
+        QThreadPool.globalInstance().waitForDone()
+        event.accept()
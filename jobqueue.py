@@ -0,0 +1,278 @@
+import os
+import time
+import socket
+import sqlite3
+import multiprocessing
+
+from analyser import FinalMarksIndex, check_form, split_forms, get_form_files, analyse_form_job
+
+SCHEMA_VERSION = 1
+
+PENDING, RUNNING, DONE, FAILED = 'pending', 'running', 'done', 'failed'  # состояния заданий
+
+LOST_ERROR = 'Процесс обработки не завершил задание за {} попыток'  # задание выдавалось упавшим процессам
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    school TEXT NOT NULL,
+    final TEXT NOT NULL,
+    form TEXT NOT NULL,
+    period TEXT NOT NULL,
+    out_path TEXT NOT NULL,
+    output_format TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    available_at REAL NOT NULL DEFAULT 0,
+    worker TEXT,
+    lease_until REAL,
+    filename TEXT,
+    duration REAL,
+    error TEXT,
+    UNIQUE (final, form, period, output_format)
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, available_at);
+CREATE INDEX IF NOT EXISTS jobs_school ON jobs (final, status);
+'''
+
+
+def get_worker_name():  # имя процесса в очереди: компьютер и номер процесса
+    return '{}:{}'.format(socket.gethostname(), os.getpid())
+
+
+def is_process_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:  # процесс есть, но принадлежит другому пользователю
+        return True
+
+    try:  # завершённый процесс, который ещё не убран родителем (зомби), тоже считается упавшим
+        with open('/proc/{}/stat'.format(pid)) as file:
+            return file.read().rpartition(')')[2].split()[0] != 'Z'
+    except (OSError, IndexError):
+        return True
+
+
+class JobQueue:  # очередь заданий (школа, класс, период) в базе SQLite, общая для нескольких процессов
+    # (задание выдаётся процессу на время lease: если процесс завис или упал, задание выдаётся снова)
+    def __init__(self, filename):
+        self.filename = filename
+        self.connection = sqlite3.connect(filename, timeout=60, isolation_level=None)  # транзакции - вручную
+        self.connection.execute('PRAGMA journal_mode=WAL')
+
+        version = self.connection.execute('PRAGMA user_version').fetchone()[0]
+        if version not in (0, SCHEMA_VERSION):
+            raise ValueError('Неподдерживаемая версия базы "{}": {}'.format(filename, version))
+        self.connection.executescript(SCHEMA)
+        self.connection.execute('PRAGMA user_version = {}'.format(SCHEMA_VERSION))
+
+    def close(self):
+        self.connection.close()
+
+    def transaction(self):  # транзакция с блокировкой записи сразу (чтобы два процесса не взяли одно задание)
+        self.connection.execute('BEGIN IMMEDIATE')
+
+    def add_school(self, filename, period, forms=None, out_path=None, output_format='xlsx'):
+        # метод для добавления классов школы в очередь, возвращает количество заданий (выполненные задания
+        # и задания с ошибками ставятся в очередь заново); out_path - общая папка, в ней создаётся папка школы;
+        # из найденных в папке классов пропускаются не подходящие к периоду (10-11 классы и 3 триместр)
+        filename = os.path.abspath(filename)
+        school = os.path.basename(os.path.dirname(filename))
+        out_path = os.path.dirname(filename) if out_path is None else os.path.abspath(os.path.join(out_path, school))
+
+        if forms is None:
+            forms = split_forms(get_form_files(filename).forms(), period)[0]
+        for form in forms:
+            error = check_form(form, period)
+            if error:
+                raise ValueError('{} ({}, {})'.format(error, school, form))
+
+        self.transaction()
+        try:
+            other = self.connection.execute('SELECT final FROM jobs WHERE out_path = ? AND final != ? LIMIT 1',
+                                            (out_path, filename)).fetchone()
+            if other is not None:
+                raise ValueError('Папка "{}" уже используется для файла "{}"'.format(out_path, other[0]))
+
+            self.connection.executemany(
+                'INSERT INTO jobs (school, final, form, period, out_path, output_format, status) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?) ON CONFLICT (final, form, period, output_format) DO UPDATE SET '
+                'out_path = excluded.out_path, status = excluded.status, attempts = 0, available_at = 0, '
+                'filename = NULL, duration = NULL, error = NULL WHERE status != ?',
+                [(school, filename, form, period, out_path, output_format, PENDING, RUNNING) for form in forms])
+            self.connection.execute('COMMIT')
+        except BaseException:
+            self.connection.execute('ROLLBACK')
+            raise
+        return len(forms)
+
+    def claim(self, worker, lease=600.0, max_attempts=3, prefer=None):
+        # метод для получения задания (None - доступных заданий нет); задания школы prefer выдаются первыми,
+        # чтобы процесс не перечитывал файл с итоговыми оценками, затем - школы с наименьшим числом процессов
+        now = time.time()
+        self.transaction()
+        try:
+            self.connection.execute('UPDATE jobs SET status = ?, error = ?, worker = NULL, lease_until = NULL '
+                                    'WHERE status = ? AND lease_until < ? AND attempts >= ?',
+                                    (FAILED, LOST_ERROR.format(max_attempts),
+                                     RUNNING, now, max_attempts))
+            row = self.connection.execute(
+                'SELECT id, school, final, form, period, out_path, output_format, attempts FROM jobs '
+                'WHERE (status = ? AND available_at <= ?) OR (status = ? AND lease_until < ?) '
+                'ORDER BY final = ? DESC, (SELECT COUNT(*) FROM jobs AS other WHERE other.final = jobs.final '
+                'AND other.status = ?), id LIMIT 1', (PENDING, now, RUNNING, now, prefer, RUNNING)).fetchone()
+            if row is not None:
+                self.connection.execute('UPDATE jobs SET status = ?, worker = ?, lease_until = ?, '
+                                        'attempts = attempts + 1 WHERE id = ?', (RUNNING, worker, now + lease, row[0]))
+            self.connection.execute('COMMIT')
+        except BaseException:
+            self.connection.execute('ROLLBACK')
+            raise
+
+        if row is None:
+            return None
+        keys = ('id', 'school', 'final', 'form', 'period', 'out_path', 'output_format', 'attempts')
+        job = dict(zip(keys, row))
+        job['worker'], job['attempts'] = worker, job['attempts'] + 1
+        return job
+
+    def ack(self, job, filename, duration):  # метод для отметки выполненного задания (False - задание уже
+        # выдано другому процессу по истечении времени)
+        cursor = self.connection.execute(
+            'UPDATE jobs SET status = ?, filename = ?, duration = ?, error = NULL, worker = NULL, lease_until = NULL '
+            'WHERE id = ? AND worker = ? AND attempts = ?', (DONE, filename, duration, job['id'], job['worker'],
+                                                             job['attempts']))
+        return cursor.rowcount == 1
+
+    def fail(self, job, error, max_attempts=3, retry_delay=10.0):
+        # метод для отметки ошибки: задание повторяется через retry_delay * номер попытки секунд,
+        # после max_attempts попыток остаётся с ошибкой
+        status = FAILED if job['attempts'] >= max_attempts else PENDING
+        cursor = self.connection.execute(
+            'UPDATE jobs SET status = ?, error = ?, available_at = ?, worker = NULL, lease_until = NULL '
+            'WHERE id = ? AND worker = ? AND attempts = ?', (status, error, time.time() + retry_delay * job['attempts'],
+                                                             job['id'], job['worker'], job['attempts']))
+        return cursor.rowcount == 1
+
+    def recover(self, max_attempts=3):  # метод для возврата в очередь заданий упавших процессов этого компьютера
+        # (не дожидаясь истечения времени выдачи), возвращает количество заданий
+        host = socket.gethostname()
+        recovered = 0
+        for job_id, worker in self.connection.execute('SELECT id, worker FROM jobs WHERE status = ?',
+                                                      (RUNNING,)).fetchall():
+            worker_host, _, pid = (worker or '').rpartition(':')
+            if worker_host != host or not pid.isdigit() or is_process_alive(int(pid)):
+                continue
+            cursor = self.connection.execute(
+                'UPDATE jobs SET status = CASE WHEN attempts >= ? THEN ? ELSE ? END, available_at = 0, '
+                'error = CASE WHEN attempts >= ? THEN ? ELSE error END, worker = NULL, lease_until = NULL '
+                'WHERE id = ? AND worker = ?',
+                (max_attempts, FAILED, PENDING, max_attempts,
+                 LOST_ERROR.format(max_attempts), job_id, worker))
+            recovered += cursor.rowcount
+        return recovered
+
+    def next_time(self):  # время, когда станет доступно ожидающее задание (None - ожидающих заданий нет,
+        # остальные выполняются другими процессами или завершены)
+        return self.connection.execute('SELECT MIN(available_at) FROM jobs WHERE status = ?', (PENDING,)).fetchone()[0]
+
+    def retry_failed(self):  # метод для возврата в очередь заданий с ошибками, возвращает количество заданий
+        cursor = self.connection.execute('UPDATE jobs SET status = ?, attempts = 0, available_at = 0, error = NULL '
+                                         'WHERE status = ?', (PENDING, FAILED))
+        return cursor.rowcount
+
+    def query(self, sql, parameters=()):  # метод для выполнения запроса, возвращает названия столбцов и строки
+        cursor = self.connection.execute(sql, parameters)
+        return [column[0] for column in cursor.description], cursor.fetchall()
+
+    def get_status(self):  # количество заданий по школам и состояниям
+        return self.query('SELECT school, status, COUNT(*) AS jobs, ROUND(SUM(duration), 2) AS duration FROM jobs '
+                          'GROUP BY final, status ORDER BY school, status')
+
+    def get_failed(self):  # задания с ошибками
+        return self.query('SELECT school, form, period, attempts, error FROM jobs WHERE status = ? '
+                          'ORDER BY school, form', (FAILED,))
+
+
+def run_worker(queue_filename, lease=600.0, max_attempts=3, retry_delay=10.0, cache=None, poll=1.0, on_result=None):
+    # рабочий процесс: выполняет задания из очереди, пока они не закончатся (on_result(job, result) вызывается
+    # после каждого задания); прочитанные данные последней школы хранятся до перехода к другой школе
+    jobs = JobQueue(queue_filename)
+    worker = get_worker_name()
+    school = None  # (файл с итоговыми оценками, размер и время изменения, индекс итоговых оценок, индекс файлов)
+
+    try:
+        while True:
+            job = jobs.claim(worker, lease, max_attempts, school[0] if school is not None else None)
+            if job is None:
+                next_time = jobs.next_time()
+                if next_time is None:
+                    return
+                time.sleep(min(max(next_time - time.time(), 0.05), poll))  # задание повторяется после задержки
+                continue
+
+            try:
+                stat = os.stat(job['final'])
+                if school is None or school[0] != job['final'] or school[1] != (stat.st_size, stat.st_mtime_ns):
+                    school = None
+                    school = (job['final'], (stat.st_size, stat.st_mtime_ns),
+                              FinalMarksIndex.load(job['final'], cache), get_form_files(job['final']))
+                os.makedirs(job['out_path'], exist_ok=True)
+                result = analyse_form_job(job['final'], job['form'], job['period'], school[2], job['out_path'],
+                                          cache=cache, form_files=school[3], output_format=job['output_format'])
+            except Exception as e:
+                result = {'form': job['form'], 'filename': None, 'duration': None, 'error': str(e)}
+
+            if result['error'] is None:
+                jobs.ack(job, result['filename'], result['duration'])
+            else:
+                school = None  # при повторе папка школы просматривается заново (файл класса мог появиться)
+                jobs.fail(job, result['error'], max_attempts, retry_delay)
+            if on_result is not None:
+                on_result(job, result)
+    finally:
+        jobs.close()
+
+
+def recover_jobs(queue_filename, max_attempts=3):  # возврат в очередь заданий упавших процессов, возвращает
+    # True, если остались невыполненные задания
+    jobs = JobQueue(queue_filename)
+    try:
+        jobs.recover(max_attempts)
+        return jobs.next_time() is not None
+    finally:
+        jobs.close()
+
+
+def run_queue(queue_filename, workers=1, lease=600.0, max_attempts=3, retry_delay=10.0, cache=None, poll=1.0,
+              on_result=None):
+    # обработка очереди в workers процессах до выполнения всех заданий (задания упавших процессов
+    # возвращаются в очередь сразу, а оставшиеся от прошлого запуска - при запуске); вместо упавшего процесса
+    # запускается новый, но не больше workers * max_attempts раз
+    if not recover_jobs(queue_filename, max_attempts):
+        return
+
+    def start_worker(index):
+        process = multiprocessing.Process(target=run_worker, name='Worker-{}'.format(index),
+                                          args=(queue_filename, lease, max_attempts, retry_delay, cache, poll,
+                                                on_result))
+        process.start()
+        return process
+
+    processes = [start_worker(index + 1) for index in range(workers)]
+    restarts = 0
+    try:
+        while len(processes) != 0:
+            processes[0].join(poll)
+            for process in [process for process in processes if not process.is_alive()]:
+                processes.remove(process)
+                if process.exitcode != 0 and recover_jobs(queue_filename, max_attempts) and\
+                        restarts < workers * max_attempts:
+                    restarts += 1
+                    processes.append(start_worker(workers + restarts))
+    finally:  # при прерывании процессы останавливаются, их задания вернутся в очередь при следующем запуске
+        for process in processes:
+            process.terminate()
+            process.join()
@@ -1,569 +1,301 @@
 import sys
 import os
 import time
-
-from openpyxl import load_workbook, Workbook
-from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
-from openpyxl.utils import get_column_letter
-from PyQt5.QtWidgets import QApplication, QWidget, QFileDialog, QPushButton,\
-    QLineEdit, QTextEdit, QLabel, QGridLayout, QComboBox
-from PyQt5.QtCore import Qt
-from PyQt5.QtGui import QFont
-
-
-def is_number(mark):
-    if (''.join(mark.split('.'))).isdigit():
-        return True
-    return False
-
-
-def get_needed_mark(mark):
-    if not is_number(mark):
-        return mark
+import argparse
+
+from analyser import ALL_PERIODS, SchoolReport, MismatchSummary, check_form, split_forms, get_collision_error, \
+    get_form_files, analyse_forms
+from cache import ParseCache
+from stats import BatchStats
+from manifest import Manifest
+from watcher import watch_folder
+from history import HistoryStore, get_school_year
+from jobqueue import JobQueue, run_queue
+from export import OUTPUT_FORMATS, check_output_format
+from readers import ENGINES
+
+
+def create_parser():  # аргументы для запуска без графического интерфейса
+    parser = argparse.ArgumentParser(description='Обработка оценок учеников')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    batch = commands.add_parser('batch', help='обработка классов без графического интерфейса')
+    batch.add_argument('--final', required=True, help='файл с итоговыми оценками (.xlsx)')
+    batch.add_argument('--period', required=True, choices=['1', '2', '3', 'Год', ALL_PERIODS],
+                       help='период аттестации (триместр/полугодие/год, Все - все периоды в одном файле)')
+    batch.add_argument('--forms', help='классы через запятую, например 5-А,5-Б (по умолчанию все классы в папке)')
+    batch.add_argument('--jobs', type=int, default=1, help='количество процессов')
+    batch.add_argument('--out', default='', help='папка для результирующих файлов')
+    batch.add_argument('--format', default='xlsx', choices=OUTPUT_FORMATS,
+                       help='формат результата: оформленный отчёт xlsx или таблицы без оформления csv/parquet '
+                            '(оценки, оценки успеваемости, несовпадения; parquet требует pyarrow)')
+    batch.add_argument('--write-only', action='store_true',
+                       help='потоковая запись результирующих файлов (память не растёт с размером отчёта)')
+    batch.add_argument('--school-report', help='общий файл по всем классам (лист на класс)')
+    batch.add_argument('--summary', help='общий файл с несовпадающими оценками всех классов (.xlsx)')
+    batch.add_argument('--cache-dir', help='папка кэша прочитанных файлов')
+    batch.add_argument('--no-cache', action='store_true', help='не использовать кэш прочитанных файлов')
+    batch.add_argument('--history', help='база SQLite для сохранения оценок и оценок успеваемости')
+    batch.add_argument('--year', help='учебный год для базы, например 2025/2026 (по умолчанию текущий)')
+    batch.add_argument('--incremental', action='store_true',
+                       help='обрабатывать только классы, входные данные которых изменились с прошлого запуска '
+                            '(кроме запуска с --school-report, --summary и --history)')
+    batch.add_argument('--stats', help='файл для сохранения замеров этапов обработки (.json или .csv)')
+    batch.add_argument('--trace-memory', action='store_true',
+                       help='замерять пиковую память этапов (tracemalloc, обработка замедляется)')
+    batch.add_argument('--reader', choices=ENGINES,
+                       help='способ чтения входных файлов (по умолчанию xml или переменная EXCEL_MARKS_READER)')
+
+    watch = commands.add_parser('watch', help='обработка классов при появлении и изменении файлов в папке')
+    watch.add_argument('--final', required=True, help='файл с итоговыми оценками (.xlsx)')
+    watch.add_argument('--period', required=True, choices=['1', '2', '3', 'Год', ALL_PERIODS],
+                       help='период аттестации (триместр/полугодие/год, Все - все периоды в одном файле)')
+    watch.add_argument('--jobs', type=int, default=1, help='количество процессов')
+    watch.add_argument('--out', default='', help='папка для результирующих файлов')
+    watch.add_argument('--format', default='xlsx', choices=OUTPUT_FORMATS, help='формат результата')
+    watch.add_argument('--debounce', type=float, default=2.0,
+                       help='пауза без новых изменений перед обработкой в секундах (по умолчанию 2)')
+    watch.add_argument('--poll', action='store_true',
+                       help='опрашивать папку вместо inotify (например, для сетевых папок)')
+    watch.add_argument('--interval', type=float, default=1.0, help='период опроса папки в секундах')
+    watch.add_argument('--cache-dir', help='папка кэша прочитанных файлов')
+    watch.add_argument('--no-cache', action='store_true', help='не использовать кэш прочитанных файлов')
+    watch.add_argument('--reader', choices=ENGINES,
+                       help='способ чтения входных файлов (по умолчанию xml или переменная EXCEL_MARKS_READER)')
+
+    queue = commands.add_parser('queue', help='очередь заданий по нескольким школам (обработка в нескольких процессах)')
+    queue.add_argument('action', choices=['add', 'run', 'status', 'retry'],
+                       help='add - добавить классы школ в очередь, run - выполнить задания очереди, '
+                            'status - состояние заданий, retry - повторить задания с ошибками')
+    queue.add_argument('--db', required=True, help='база SQLite с очередью заданий')
+    queue.add_argument('--final', action='append',
+                       help='файл с итоговыми оценками школы (для add, можно указать несколько раз)')
+    queue.add_argument('--period', choices=['1', '2', '3', 'Год', ALL_PERIODS], help='период аттестации (для add)')
+    queue.add_argument('--forms', help='классы через запятую (для add, по умолчанию все классы в папке школы)')
+    queue.add_argument('--out', help='папка для результирующих файлов с папкой на каждую школу '
+                                     '(для add, по умолчанию файлы записываются в папку школы)')
+    queue.add_argument('--format', default='xlsx', choices=OUTPUT_FORMATS, help='формат результата (для add)')
+    queue.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='количество процессов (для run)')
+    queue.add_argument('--lease', type=float, default=600.0,
+                       help='время в секундах, после которого задание зависшего процесса выдаётся снова')
+    queue.add_argument('--attempts', type=int, default=3, help='количество попыток выполнения задания')
+    queue.add_argument('--retry-delay', type=float, default=10.0,
+                       help='задержка повтора задания с ошибкой в секундах (умножается на номер попытки)')
+    queue.add_argument('--cache-dir', help='папка кэша прочитанных файлов')
+    queue.add_argument('--no-cache', action='store_true', help='не использовать кэш прочитанных файлов')
+    queue.add_argument('--reader', choices=ENGINES,
+                       help='способ чтения входных файлов (по умолчанию xml или переменная EXCEL_MARKS_READER)')
+
+    history = commands.add_parser('history', help='запросы к базе оценок')
+    history.add_argument('query', choices=['mismatches', 'classifications', 'drops', 'student'],
+                         help='несовпадения с рекомендуемыми оценками, оценки успеваемости, ухудшения оценки '
+                              'успеваемости с прошлого периода, история ученика')
+    history.add_argument('--db', required=True, help='база SQLite')
+    history.add_argument('--year', help='учебный год, например 2025/2026 (по умолчанию текущий)')
+    history.add_argument('--period', default='1', choices=['1', '2', '3', 'Год'], help='период аттестации')
+    history.add_argument('--form', help='класс')
+    history.add_argument('--subject', help='предмет')
+    history.add_argument('--student', help='ученик (фамилия и имя)')
+
+    return parser
+
+
+def run_batch(args):  # обработка классов из командной строки, возвращает код завершения
+    if not args.final.endswith('.xlsx'):
+        print('Ошибка: Неподдерживаемое расширение файла: "{}".'.format(args.final.split('.')[-1]))
+        return 1
+    error = check_output_format(args.format)  # до обработки, чтобы не получить ошибку для каждого класса
+    if error:
+        print('Ошибка: {}.'.format(error))
+        return 1
+
+    form_files = get_form_files(args.final)  # папка просматривается один раз для всех классов
+    if args.forms:
+        forms = [form.strip().upper() for form in args.forms.split(',') if form.strip()]
+        for form in forms:  # указанные явно классы должны подходить к периоду
+            error = check_form(form, args.period)
+            if error:
+                print('Ошибка: {} ({}).'.format(error, form))
+                return 1
     else:
-        mark = float(mark)
-
-    if mark == 0:
-        return '0'
-    elif mark < 2.5:
-        return '2'
-    elif mark < 3.5:
-        return '3'
-    elif mark < 4.5:
-        return '4'
-    return '5'
-
-
-def classify(marks):
-    if 'Н/А' in marks:
-        return 'Есть неаттестации'
-    if 'Нзч' in marks:
-        return 'Есть незачёты'
-    if '2' in marks:
-        return 'Двоечник'
-    if marks.count('3') == 1:
-        return 'С одной 3'
-    if marks.count('3') > 1:
-        return 'Троечник'
-    if marks.count('4') == 1:
-        return 'С одной 4'
-    if marks.count('4') > 1:
-        return 'Хорошист'
-    if '5' in marks:
-        return 'Отличник'
-    return 'Недостаточно данных'
-
-
-class ExcelMarksInterface(QWidget):
-    def __init__(self):
-        super().__init__()
-        self.needed_file_description, self.select_file_button, self.selected_file_label, self.period_label,\
-            self.period_input, self.form_data_description, self.form_input, self.start_analysing_button,\
-            self.or_label, self.start_analysing_all_button, self.output_console = [None] * 11
-        self.init_ui()
-        self.analyser = ExcelMarksAnalyser()
-        self.filename = None
-        self.show()
-
-    def init_ui(self):
-        self.setFixedSize(800, 600)
-        self.setWindowTitle('Обработка оценок учеников')
-
-        grid = QGridLayout()
-        grid.setContentsMargins(40, 20, 40, 30)
-        grid.setSpacing(15)
-        self.setLayout(grid)
-
-        self.needed_file_description = QLabel('Выберите файл с итоговыми оценками:', self)
-        self.needed_file_description.setFont(QFont('Arial', 13))
-        grid.addWidget(self.needed_file_description, 0, 0, 1, 3, alignment=Qt.AlignCenter)
-
-        self.select_file_button = QPushButton('Выбрать файл', self)
-        self.select_file_button.setFont(QFont('Arial', 13))
-        self.select_file_button.clicked.connect(self.select_file)
-        self.select_file_button.setFixedSize(150, 40)
-        grid.addWidget(self.select_file_button, 1, 0, alignment=Qt.AlignCenter)
-
-        self.selected_file_label = QLabel('Файл не выбран.', self)
-        self.selected_file_label.setFont(QFont('Arial', 13))
-        grid.addWidget(self.selected_file_label, 1, 1, 1, 2)
-
-        self.period_label = QLabel('Период аттестации (триместр/полугодие/год):', self)
-        self.period_label.setFont(QFont('Arial', 13))
-        grid.addWidget(self.period_label, 2, 0, 1, 2, alignment=Qt.AlignCenter)
-
-        self.period_input = QComboBox(self)
-        self.period_input.addItems(['1', '2', '3', 'Год'])
-        self.period_input.setFont(QFont('Arial', 14))
-        grid.addWidget(self.period_input, 2, 2, alignment=Qt.AlignCenter)
-
-        self.form_data_description = QLabel('Название класса (разделяя номер и букву дефисом):', self)
-        self.form_data_description.setFont(QFont('Arial', 13))
-        grid.addWidget(self.form_data_description, 3, 0, 1, 2, alignment=Qt.AlignCenter)
-
-        self.form_input = QLineEdit('', self)
-        self.form_input.setFont(QFont('Arial', 14))
-        self.form_input.setMaximumWidth(150)
-        grid.addWidget(self.form_input, 3, 2, alignment=Qt.AlignCenter)
-
-        self.start_analysing_button = QPushButton('Обработать', self)
-        self.start_analysing_button.setFont(QFont('Arial', 13))
-        self.start_analysing_button.clicked.connect(self.analyse)
-        self.start_analysing_button.setAutoDefault(True)
-        self.start_analysing_button.setFixedSize(200, 50)
-        grid.addWidget(self.start_analysing_button, 4, 0, 1, 3, alignment=Qt.AlignCenter)
-
-        self.or_label = QLabel('ИЛИ', self)
-        self.or_label.setFont(QFont('Arial', 13))
-        grid.addWidget(self.or_label, 5, 0, 1, 3, alignment=Qt.AlignCenter)
-
-        self.start_analysing_all_button = QPushButton('Обработать все файлы в папке')
-        self.start_analysing_all_button.setFont(QFont('Arial', 13))
-        self.start_analysing_all_button.clicked.connect(self.analyse_all)
-        self.start_analysing_all_button.setFixedSize(300, 50)
-        grid.addWidget(self.start_analysing_all_button, 6, 0, 1, 3, alignment=Qt.AlignCenter)
-
-        self.output_console = QTextEdit('', self)
-        self.output_console.setFont(QFont('Arial', 12))
-        self.output_console.setReadOnly(True)
-        self.output_console.setMaximumHeight(300)
-        grid.addWidget(self.output_console, 7, 0, 1, 3)
-
-    def select_file(self):  # метод для отображения окна выбора файла
-        filename = QFileDialog.getOpenFileName(self, 'Выбор файла для обработки')[0]
-        if filename == '':
-            self.selected_file_label.setText('Файл не выбран.')
+        forms, skipped_forms = split_forms(form_files.forms(), args.period)
+        for form, error in skipped_forms.items():
+            print('{}: пропущен: {}.'.format(form, error))
+    if len(forms) == 0:
+        print('Ошибка: Файлы со средними оценками не найдены.')
+        return 1
+
+    if args.out:
+        os.makedirs(args.out, exist_ok=True)
+
+    school_report = SchoolReport(args.school_report) if args.school_report else None
+    history = HistoryStore(args.history) if args.history else None
+    summary = MismatchSummary(args.summary) if args.summary else None
+
+    collisions = form_files.collisions(forms)  # о классах с несколькими файлами сообщается один раз до обработки
+    for form, files in collisions.items():
+        print('{}: ошибка: {}.'.format(form, get_collision_error(form, files)))
+
+    failed, skipped = len(collisions), 0
+    start_time = time.time()
+    cache = None if args.no_cache else ParseCache(args.cache_dir)
+    stats = BatchStats(args.trace_memory)
+    manifest = Manifest(args.out) if args.incremental and summary is None else None  # в общий файл нужны все классы
+
+    for result in analyse_forms(args.final, [form for form in forms if form not in collisions.keys()], args.period,
+                                args.jobs, args.out, args.write_only, school_report is not None or history is not None,
+                                cache, form_files, stats, manifest, args.format):
+        if result['error'] is not None:
+            failed += 1
+            print('{}: ошибка: {}.'.format(result['form'], result['error']))
+        elif result['skipped']:
+            skipped += 1
+            print('{}: без изменений, файл "{}".'.format(result['form'], result['filename']))
         else:
-            self.filename = filename
-            self.selected_file_label.setText('Выбранный файл: "{}".'.format(filename.split('/')[-1]))
-
-    def analyse(self, form=None, period=None):  # метод для обработки файла
-        if self.filename in (None, ''):  # проверка на то, что файл не выбран
-            self.output_console.append('Ошибка: Файл не выбран.\n')
-            return
-        if not self.filename.endswith('.xlsx'):  # проверка на расширение файла
-            self.output_console.append('Ошибка: Неподдерживаемое расширение файла: "{}".\n'.
-                                       format(self.filename.split('.')[-1]))
-            return
-
-        if not form:
-            form = self.form_input.text().upper()
-        if form == '':  # проверка на то, что класс не указан
-            self.output_console.append('Ошибка: Класс не указан.\n')
-            return
-        if '-' not in form:  # проверка на отсутствие дефиса в названии класса
-            self.output_console.append('Ошибка: Неправильный формат названия класса.\n')
-            return
-
-        if not period:
-            period = self.period_input.currentText()
-        if int(form.split('-')[0]) in (10, 11) and period == '3':
-            self.output_console.append('Ошибка: Неправильный формат периода аттестации.\n')
-            return
-
-        try:
-            start_time = time.time()
+            print('{}: {} сек., файл "{}".'.format(result['form'], round(result['duration'], 2),
+                                                  result['filename']))
+            if school_report is not None:
+                school_report.add_form(result['analyser'], result['form'], args.period)
+            if history is not None:
+                history.add_form(result['analyser'], result['form'], args.period, args.year)
+            if summary is not None:
+                summary.add_form(result['form'], result['mismatches'])
+
+    if school_report is not None:
+        school_report.save()
+        print('Файл "{}" успешно создан.'.format(args.school_report))
+    if summary is not None:
+        summary.save()
+        print('Файл "{}" успешно создан, несовпадающих оценок: {}.'.format(args.summary, summary.count()))
+    if history is not None:
+        history.close()
+        print('Данные сохранены в базу "{}".'.format(args.history))
+
+    print('Обработано классов: {}, без изменений: {}, с ошибками: {}. Длительность выполнения: {} сек.'.format(
+        len(forms) - failed - skipped, skipped, failed, round(time.time() - start_time, 2)))
+    print(stats.format_table())
+    if args.stats:
+        stats.save(args.stats)
+        print('Замеры сохранены в "{}".'.format(args.stats))
+    return 1 if failed else 0
+
+
+def run_watch(args):  # обработка классов при изменении файлов до прерывания (Ctrl+C), возвращает код завершения
+    if not args.final.endswith('.xlsx'):
+        print('Ошибка: Неподдерживаемое расширение файла: "{}".'.format(args.final.split('.')[-1]))
+        return 1
+    error = check_output_format(args.format)
+    if error:
+        print('Ошибка: {}.'.format(error))
+        return 1
+
+    if args.out:
+        os.makedirs(args.out, exist_ok=True)
+    cache = None if args.no_cache else ParseCache(args.cache_dir)
+    message = 'Ожидание изменений в папке "{}".'.format(os.path.dirname(os.path.abspath(args.final)))
 
-            new_filename = 'Заключение по итоговым оценкам_{}.xlsx'.format(form)
+    try:
+        for result in watch_folder(args.final, args.period, args.out, args.jobs, args.debounce, args.poll,
+                                   args.interval, cache, lambda: print(message, flush=True), args.format):
+            if result['error'] is not None:
+                print('{}: ошибка: {}.'.format(result['form'], result['error']))
+            elif not result['skipped']:
+                print('{}: {} сек., файл "{}".'.format(result['form'], round(result['duration'], 2),
+                                                      result['filename']))
+    except KeyboardInterrupt:
+        print('Отслеживание папки остановлено.')
+    return 0
+
+
+def print_job_result(job, result):  # вывод результата задания очереди (вызывается в процессах обработки)
+    if result['error'] is not None:
+        print('{} {}: ошибка (попытка {}): {}.'.format(job['school'], job['form'], job['attempts'], result['error']),
+              flush=True)
+    else:
+        print('{} {}: {} сек., файл "{}".'.format(job['school'], job['form'], round(result['duration'], 2),
+                                                 result['filename']), flush=True)
+
+
+def run_queue_command(args):  # работа с очередью заданий, возвращает код завершения
+    if args.action == 'add' and (not args.final or args.period is None):
+        print('Ошибка: Не указаны файлы с итоговыми оценками (--final) или период (--period).')
+        return 1
+    error = check_output_format(args.format) if args.action == 'add' else None
+    if error:
+        print('Ошибка: {}.'.format(error))
+        return 1
+
+    if args.action == 'run':
+        start_time = time.time()
+        run_queue(args.db, max(args.workers, 1), args.lease, args.attempts, args.retry_delay,
+                  None if args.no_cache else ParseCache(args.cache_dir), on_result=print_job_result)
+        print('Длительность выполнения: {} сек.'.format(round(time.time() - start_time, 2)))
+
+    jobs = JobQueue(args.db)
+    try:
+        if args.action == 'add':
+            forms = [form.strip().upper() for form in args.forms.split(',') if form.strip()] if args.forms else None
+            for filename in args.final:
+                count = jobs.add_school(filename, args.period, forms, args.out, args.format)
+                print('{}: добавлено заданий: {}.'.format(filename, count))
+        elif args.action == 'retry':
+            print('Возвращено в очередь заданий: {}.'.format(jobs.retry_failed()))
+
+        columns, rows = jobs.get_status()
+        failed_columns, failed = jobs.get_failed()
+    finally:
+        jobs.close()
+
+    for table_columns, table_rows in ((columns, rows), (failed_columns, failed)):
+        if len(table_rows) == 0:
+            continue
+        print('\t'.join(table_columns))
+        for row in table_rows:
+            print('\t'.join('' if value is None else str(value) for value in row))
+    return 1 if args.action == 'run' and len(failed) != 0 else 0
+
+
+def run_history(args):  # запрос к базе оценок, результат выводится через табуляцию
+    if args.query == 'student' and args.student is None:
+        print('Ошибка: Не указан ученик (--student).')
+        return 1
+
+    history = HistoryStore(args.db)
+    year = args.year or get_school_year()
+    try:
+        if args.query == 'mismatches':
+            columns, rows = history.get_mismatches(year, args.period, args.form, args.subject, args.student)
+        elif args.query == 'classifications':
+            columns, rows = history.get_classifications(year, args.period, args.form)
+        elif args.query == 'drops':
+            columns, rows = history.get_classification_drops(year, args.period, args.form)
+        else:
+            columns, rows = history.get_student_history(args.student, args.subject)
+    finally:
+        history.close()
 
-            self.analyser.analyse_file(self.filename, form, period)
-            self.analyser.create_resulting_file(new_filename, form, period)
-            self.analyser.reset()
+    print('\t'.join(columns))
+    for row in rows:
+        print('\t'.join('' if value is None else str(value) for value in row))
+    return 0
 
-            self.output_console.append('Успешно обработано: "{}" ({}).'.format(self.filename, form))
-            self.output_console.append('Файл "{}" успешно создан.'.format(new_filename))
-            self.output_console.append('Длительность выполнения: {} сек.\n'.
-                                       format(str(round(time.time() - start_time, 2))))
 
+def main():
+    if len(sys.argv) > 1:  # запуск из командной строки без графического интерфейса
+        args = create_parser().parse_args()
+        if getattr(args, 'reader', None):  # через переменную окружения способ чтения наследуют процессы обработки
+            os.environ['EXCEL_MARKS_READER'] = args.reader
+        try:
+            commands = {'batch': run_batch, 'watch': run_watch, 'queue': run_queue_command, 'history': run_history}
+            sys.exit(commands[args.command](args))
         except Exception as e:
-            self.output_console.append('Ошибка: {}.\n'.format(e))
-
-    def analyse_all(self):
-        if self.filename in (None, ''):  # проверка на то, что файл не выбран
-            self.output_console.append('Ошибка: Файл не выбран.\n')
-            return
-        if not self.filename.endswith('.xlsx'):  # проверка на расширение файла
-            self.output_console.append('Ошибка: Неподдерживаемое расширение файла: "{}".\n'.
-                                       format(self.filename.split('.')[-1]))
-            return
+            print('Ошибка:', e)
+            sys.exit(1)
 
-        period = self.period_input.currentText()
-
-        if len(self.filename.split('/')) > 1:
-            path = '/'.join(self.filename.split('/')[:-1]) + '/'
-        else:
-            path = ''
-
-        files = os.listdir(path)
-        forms = []
-        for file in files:
-            file = file.split('-')
-            if not file[-1].endswith('.xlsx'):
-                continue
-
-            for i in range(len(file) - 1):
-                if len(file[i]) < 1 or len(file[i + 1]) < 1:
-                    continue
-
-                if file[i + 1][0].isalpha():
-                    if file[i].endswith('10') or file[i].endswith('11'):
-                        forms.append(file[i][-2:] + '-' + file[i + 1][0])
-                        break
-                    elif file[i][-1].isdigit():
-                        forms.append(file[i][-1] + '-' + file[i + 1][0])
-                        break
-
-        for form in forms:
-            self.analyse(form, period)
-            self.output_console.repaint()
-
-        self.output_console.append('Обработка файлов завершена.\n')
-
-
-class ExcelMarksAnalyser:
-    def __init__(self):
-        self.all_subjects = None
-        self.students = {}
-        self.classifications = {}
-        self.THIN = Side(border_style='thin', color='000000')
-        self.THICK = Side(border_style='thick', color='000000')
-        self.DOUBLE = Side(border_style='double', color='000000')
-
-    def reset(self):
-        self.all_subjects = None
-        self.students = {}
-        self.classifications = {}
-
-    def get_average_marks(self, path, filenames, period):  # метод для получения средних баллов из первого файла
-        if len(filenames) == 1:
-            file_num = 0
-        else:
-            raise ValueError('Слишком много файлов со средними оценками')
-
-        workbook = load_workbook('{}{}'.format(path, filenames[file_num]), read_only=True)
-        sheet = workbook.active
-
-        subjects = list(map(lambda s: s.value, sheet[6][1:]))
-        self.all_subjects = subjects.copy()
-
-        row_num = 7
-        while True:  # пробегаемся по всем рядам таблицы с учениками
-            if row_num > sheet.max_row:
-                break
-            row = list(map(lambda c: c.value, sheet[row_num]))
-            student = row[0]
-            if student in ('', None):  # проверка на пустоту ячейки
-                break
-            if student not in self.students.keys():
-                self.students[student] = {}
-
-            for mark_index in range(len(row[1:])):  # пробегаемся по всем оценкам данного ученика
-                mark = row[1:][mark_index]
-                subject = subjects[mark_index]
-
-                if subject not in self.students[student].keys():
-                    self.students[student][subject] = [[None] * 2, [None] * 2, [None] * 2, [None] * 2]
-
-                if period.isdigit():
-                    self.students[student][subject][int(period) - 1][0] = mark
-                else:
-                    self.students[student][subject][3][0] = mark
-
-            row_num += 1
-
-    def get_final_marks(self, filename, form):  # метод для получения триместровых оценок
-        workbook = load_workbook(filename, read_only=False)
-
-        form_num = form.split('-')[0]
-        sheet = workbook[form_num]
-
-        data = list(map(lambda el: el.value, sheet['B']))
-        index = data.index(form) + 1
-
-        subj_index = index + 2
-        col = 2
-        subjects, periods = {}, {}
-        while sheet.cell(row=subj_index + 1, column=col).value not in (None, ''):  # анализируем шапку
-            subject = sheet.cell(row=subj_index, column=col).value
-            if subject not in (None, ''):
-                subjects[col] = subject
-
-                if subject not in self.all_subjects:
-                    self.all_subjects.append(subject)
-            else:
-                subjects[col] = subjects[col - 1]
-
-            period = sheet.cell(row=subj_index + 1, column=col).value
-            if period not in (None, ''):
-                periods[col] = period
-
-            col += 1
-
-        max_col = col
-
-        student_index = subj_index + 2
-        student_name = sheet.cell(row=student_index, column=1).value
-        while student_name not in (None, ''):  # пробегаемся по всем ученикам нужного класса
-            short_name = ' '.join(student_name.split()[:2])
-
-            if short_name not in self.students.keys():
-                self.students[short_name] = {}
-
-            for col in range(2, max_col):  # пробегаемся по всем оценкам данного ученика
-                mark = sheet.cell(row=student_index, column=col).value
-                if mark in (None, ''):
-                    continue
-
-                subject = subjects[col]
-                if subject not in self.students[short_name].keys():
-                    self.students[short_name][subject] = [[None] * 2, [None] * 2, [None] * 2, [None] * 2]
-
-                if int(form_num) in (10, 11):
-                    if periods[col] == 'Первое полугодие':  # если это итоговая 1 полугодия
-                        self.students[short_name][subject][0][1] = mark
-                    elif periods[col] == 'Второе полугодие':  # если это итоговая 2 полугодия
-                        self.students[short_name][subject][1][1] = mark
-                else:
-                    if periods[col] == '1 триместр':  # если это итоговая 1 триместра
-                        self.students[short_name][subject][0][1] = mark
-                    elif periods[col] == '2 триместр':  # если это итоговая 2 триместра
-                        self.students[short_name][subject][1][1] = mark
-                    elif periods[col] == '3 триместр':  # если это итоговая 3 триместра
-                        self.students[short_name][subject][2][1] = mark
-
-                if periods[col] == 'Год':  # если это годовая оценка
-                    self.students[short_name][subject][3][1] = mark
-
-            student_index += 1
-            student_name = sheet.cell(row=student_index, column=1).value
-
-    def classify_students(self, period):
-        for student in self.students:
-            marks = []
-            for subject in self.students[student]:
-                if period.isdigit():
-                    marks.append(self.students[student][subject][int(period) - 1][1])
-                else:
-                    marks.append(self.students[student][subject][3][1])
-
-            self.classifications[student] = classify(marks)
-
-    def analyse_file(self, filename, form, period):  # основной метод для обработки данных файлов
-        if len(filename.split('/')) > 1:
-            path = '/'.join(filename.split('/')[:-1]) + '/'
-        else:
-            path = ''
-
-        filenames = []
-        for file in os.listdir(path):
-            if form in file and '.xlsx' in file:
-                filenames.append(file)
-
-        if len(filenames) == 0:
-            raise ValueError('Файл со средними оценками не найден')
-
-        self.get_average_marks(path, filenames, period)
-        self.get_final_marks(filename, form)
-        self.classify_students(period)
-
-    def create_resulting_file(self, filename, form, period):  # метод для создания результирующего файла
-        wrong_marks = []
-
-        workbook = Workbook()
-        sheet = workbook.active
-
-        sheet['A1'] = 'Номер'
-        sheet['A1'].alignment = Alignment(horizontal='center', vertical='center')
-        sheet.merge_cells('A1:A3')
-        sheet['A1'].border, sheet['A2'].border, sheet['A3'].border = \
-            Border(right=self.THIN), Border(right=self.THIN), Border(right=self.THIN, bottom=self.THIN)
-        sheet.column_dimensions['A'].width = 8
-
-        sheet['B1'] = 'Имя ученика'
-        sheet['B1'].alignment = Alignment(horizontal='center', vertical='center')
-        sheet.merge_cells('B1:B3')
-        sheet['B1'].border, sheet['B2'].border, sheet['B3'].border = \
-            Border(right=self.THICK), Border(right=self.THICK), Border(right=self.THICK, bottom=self.THIN)
-        sheet.column_dimensions['B'].width = 45
-
-        student_index = 0  # порядковый номер ученика
-        for student in sorted(self.students.keys()):  # пробегаемся по всем ученикам
-            sheet.cell(row=student_index + 4, column=1).alignment = Alignment(horizontal='left')
-
-            if student_index == len(self.students) - 1:
-                sheet.cell(row=student_index + 4, column=2, value=student).border = Border(bottom=self.THIN,
-                                                                                           right=self.THICK)
-                sheet.cell(row=student_index + 4, column=1, value=student_index + 1).border = Border(bottom=self.THIN,
-                                                                                                     right=self.THIN)
-            else:
-                sheet.cell(row=student_index + 4, column=1, value=student_index + 1).border = Border(right=self.THIN)
-                sheet.cell(row=student_index + 4, column=2, value=student).border = Border(right=self.THICK)
-
-            subject_index = 0
-            for subject in sorted(self.all_subjects):  # пробегаемся по всем предметам
-
-                subject_column = 3 + subject_index * 3
-                if student_index == 0:  # если это список предметов первого ученика, заполняем шапку
-                    sheet.cell(row=1, column=subject_column).value = subject
-                    sheet.cell(row=1, column=subject_column).alignment = Alignment(horizontal='center')
-                    sheet.merge_cells(start_row=1, start_column=subject_column,
-                                      end_row=1, end_column=subject_column + 2)
-                    sheet.cell(row=1, column=subject_column + 2).border = Border(right=self.THICK)
-
-                if student_index == 0:  # если это список предметов первого ученика, заполняем шапку
-                    if not period.isdigit():
-                        sheet.cell(row=2, column=subject_column).value = 'Год'
-                    elif int(form.split('-')[0]) in (10, 11):
-                        sheet.cell(row=2, column=subject_column).value = '{}-е полугодие'.format(period)
-                    else:
-                        sheet.cell(row=2, column=subject_column).value = '{}-й триместр'.format(period)
-
-                    sheet.cell(row=2, column=subject_column).alignment = Alignment(horizontal='center')
-                    sheet.merge_cells(start_row=2, start_column=subject_column,
-                                      end_row=2, end_column=subject_column + 2)
-                    sheet.cell(row=2, column=subject_column).border = Border(top=self.THIN, bottom=self.THIN)
-                    sheet.cell(row=2, column=subject_column + 1).border = Border(top=self.THIN, bottom=self.THIN)
-                    sheet.cell(row=2, column=subject_column + 2).border = Border(bottom=self.THIN,
-                                                                                 top=self.THIN, right=self.THICK)
-
-                    sheet.cell(row=3, column=subject_column).value = 'ср. б.'
-                    sheet.cell(row=3, column=subject_column + 1).value = 'рек.'
-                    sheet.cell(row=3, column=subject_column + 2).value = 'фактич.'
-
-                    sheet.cell(row=3, column=subject_column).alignment = Alignment(horizontal='center')
-                    sheet.cell(row=3, column=subject_column + 1).alignment = Alignment(horizontal='center')
-                    sheet.cell(row=3, column=subject_column + 2).alignment = Alignment(horizontal='center')
-
-                    sheet.cell(row=3, column=subject_column).border = Border(bottom=self.THIN, right=self.THIN)
-                    sheet.cell(row=3, column=subject_column + 1).border = Border(bottom=self.THIN, right=self.THIN)
-                    sheet.cell(row=3, column=subject_column + 2).border = Border(bottom=self.THIN, right=self.THICK)
-
-                if subject in self.students[student].keys():
-                    if period.isdigit():
-                        marks = ['0' if mark is None else mark for mark in
-                                 self.students[student][subject][int(period) - 1]]
-                    else:
-                        marks = ['0' if mark is None else mark for mark in self.students[student][subject][3]]
-                else:
-                    marks = ['0', '0']
-
-                if is_number(marks[0]):
-                    marks[0] = float(marks[0])
-                if is_number(marks[1]):
-                    marks[1] = int(marks[1])
-                sheet.cell(row=student_index + 4, column=subject_column).value = marks[0]
-                sheet.cell(row=student_index + 4, column=subject_column + 2).value = marks[1]
-
-                sheet.cell(row=student_index + 4, column=subject_column).alignment = Alignment(horizontal='center')
-                sheet.cell(row=student_index + 4, column=subject_column + 2).alignment = Alignment(horizontal='center')
-
-                recommended = get_needed_mark(str(marks[0]))
-                if is_number(recommended):
-                    recommended = int(recommended)
-                sheet.cell(row=student_index + 4, column=subject_column + 1).value = recommended
-                sheet.cell(row=student_index + 4, column=subject_column + 1).alignment = Alignment(horizontal='center')
-
-                if recommended != marks[1]:
-                    wrong_marks.append({'name': student, 'subject': subject, 'period': period,
-                                        'average': marks[0], 'recommended': recommended, 'actual': marks[1]})
-
-                    sheet.cell(row=student_index + 4, column=subject_column).font = Font(b=True)
-                    sheet.cell(row=student_index + 4, column=subject_column + 1).font = Font(b=True)
-                    sheet.cell(row=student_index + 4, column=subject_column + 2).font = Font(b=True)
-                    sheet.cell(row=student_index + 4, column=subject_column).fill = PatternFill(
-                        start_color='FF4040',
-                        end_color='FF4040',
-                        fill_type='solid')
-                    sheet.cell(row=student_index + 4, column=subject_column + 1).fill = PatternFill(
-                        start_color='FF4040',
-                        end_color='FF4040',
-                        fill_type='solid')
-                    sheet.cell(row=student_index + 4, column=subject_column + 2).fill = PatternFill(
-                        start_color='FF4040',
-                        end_color='FF4040',
-                        fill_type='solid')
-
-                if student_index == len(self.students) - 1:  # если это последний ученик в списке,
-                    # рисуем нижнюю границу
-                    sheet.cell(row=student_index + 4, column=subject_column).border = Border(bottom=self.THIN,
-                                                                                             right=self.THIN)
-                    sheet.cell(row=student_index + 4, column=subject_column + 1).border = Border(bottom=self.THIN,
-                                                                                                 right=self.THIN)
-                    sheet.cell(row=student_index + 4, column=subject_column + 2).border = Border(bottom=self.THIN,
-                                                                                                 right=self.THICK)
-                else:
-                    sheet.cell(row=student_index + 4, column=subject_column).border = Border(right=self.THIN)
-                    sheet.cell(row=student_index + 4, column=subject_column + 1).border = Border(right=self.THIN)
-                    sheet.cell(row=student_index + 4, column=subject_column + 2).border = Border(right=self.THICK)
-
-                subject_index += 1
-
-            classification_column = 4 + subject_index * 3
-            if student_index == 0:
-                sheet.column_dimensions[get_column_letter(classification_column)].width = 25
-                sheet.merge_cells(start_row=1, end_row=3,
-                                  start_column=classification_column, end_column=classification_column)
-                sheet.cell(row=1, column=classification_column,
-                           value='Оценка успеваемости').alignment = Alignment(horizontal='center', vertical='center')
-                sheet.cell(row=1, column=classification_column).border = Border(left=self.THIN, right=self.THIN)
-                sheet.cell(row=2, column=classification_column).border = Border(left=self.THIN, right=self.THIN)
-                sheet.cell(row=3, column=classification_column).border = Border(left=self.THIN, right=self.THIN,
-                                                                                bottom=self.THIN)
-
-            sheet.cell(row=student_index + 4, column=classification_column,
-                       value=self.classifications[student]).alignment = Alignment(horizontal='center')
-            if student_index == len(self.students) - 1:
-                sheet.cell(row=student_index + 4, column=classification_column).border = \
-                    Border(left=self.THIN, right=self.THIN, bottom=self.THIN)
-            else:
-                sheet.cell(row=student_index + 4, column=classification_column).border = \
-                    Border(left=self.THIN, right=self.THIN)
-
-            student_index += 1
-
-        if len(wrong_marks) != 0:
-            res_sheet = workbook.create_sheet('Results')
-
-            wrong_marks.sort(key=lambda el: el['subject'])
-
-            col_names = ('Ученик', 'Предмет', 'Период', 'Ср. б.', 'Рек.', 'Фактич.')
-            for col in range(1, 7):
-                res_sheet.cell(row=1, column=col, value=col_names[col - 1]).alignment = Alignment(horizontal='center')
-                res_sheet.cell(row=1, column=col).font = Font(b=True)
-                res_sheet.cell(row=1, column=col).border = Border(right=self.DOUBLE, bottom=self.DOUBLE)
-
-            res_sheet.column_dimensions['A'].width = 35
-            res_sheet.column_dimensions['B'].width = 25
-            res_sheet.column_dimensions['C'].width = 20
-
-            if not period.isdigit():
-                for i in range(len(wrong_marks)):
-                    wrong_marks[i]['period'] = 'Год'
-            elif int(form.split('-')[0]) in (10, 11):
-                for i in range(len(wrong_marks)):
-                    wrong_marks[i]['period'] = '{}-е полугодие'.format(wrong_marks[i]['period'])
-            else:
-                for i in range(len(wrong_marks)):
-                    wrong_marks[i]['period'] = '{}-й триместр'.format(wrong_marks[i]['period'])
-
-            keys = ('name', 'subject', 'period', 'average', 'recommended', 'actual')
-            last = False
-            for row in range(1, len(wrong_marks) + 1):
-                if row == len(wrong_marks):
-                    last = True
-                for col in range(1, 7):
-                    if not last:
-                        res_sheet.cell(row=row + 1, column=col, value=wrong_marks[row - 1][keys[col - 1]])\
-                            .border = Border(right=self.THIN)
-                    else:
-                        res_sheet.cell(row=row + 1, column=col, value=wrong_marks[row - 1][keys[col - 1]])\
-                            .border = Border(right=self.THIN, bottom=self.THIN)
-
-        workbook.save(filename)
-
-
-def main():
     try:
+        from PyQt5.QtWidgets import QApplication  # PyQt5 загружается только для графического интерфейса
+        from interface import ExcelMarksInterface
+
         app = QApplication(sys.argv)
         gui = ExcelMarksInterface()
         sys.exit(app.exec())
@@ -0,0 +1,114 @@
+import os
+import json
+import hashlib
+
+from cache import get_file_hash
+
+MANIFEST_VERSION = 2  # меняется при изменении формата манифеста или результирующих файлов
+MANIFEST_FILENAME = '.excel_marks_manifest.json'
+
+
+def get_file_state(filename, state=None):  # отпечаток файла (хэш пересчитывается при изменении размера или времени)
+    filename = os.path.abspath(filename)
+    stat = os.stat(filename)
+    if state is not None and state['file'] == filename and state['size'] == stat.st_size and\
+            state['mtime_ns'] == stat.st_mtime_ns:
+        return state
+    return {'file': filename, 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'hash': get_file_hash(filename)}
+
+
+def get_block_state(final_marks, form):  # отпечаток блока класса в файле с итоговыми оценками (None - блока нет)
+    if form not in final_marks.forms.keys():
+        return None
+    form_data = final_marks.forms[form]
+    data = repr((form_data['subjects'], form_data['periods'], form_data['students']))  # без расположения блока
+    return {'sheet': form_data['sheet'], 'rows': [form_data['first_row'], form_data['last_row']],
+            'hash': hashlib.sha1(data.encode('utf-8')).hexdigest()}
+
+
+def is_output_unchanged(state):  # проверка, что результирующий файл не удалён и не изменён после создания
+    if state is None:
+        return False
+    try:
+        stat = os.stat(state['file'])
+    except OSError:
+        return False
+    return stat.st_size == state['size'] and stat.st_mtime_ns == state['mtime_ns']
+
+
+class Manifest:  # сведения о входных данных каждого результирующего файла (для пропуска неизменившихся классов)
+    def __init__(self, path=''):
+        self.filename = os.path.join(path, MANIFEST_FILENAME)
+        self.final = None  # последний отпечаток файла с итоговыми оценками (чтобы не пересчитывать хэш)
+        self.forms = {}  # класс -> {'period', 'format', 'average', 'final_hash', 'final', 'output'}
+        self.pending = {}  # отпечатки входных данных классов, отправленных на обработку
+
+        try:
+            with open(self.filename, encoding='utf-8') as file:
+                data = json.load(file)
+            if data.get('version') == MANIFEST_VERSION:
+                self.final, self.forms = data['final'], data['forms']
+        except (OSError, ValueError, KeyError):  # манифеста нет или он повреждён - обрабатываются все классы
+            pass
+
+    def check(self, filename, forms, period, form_files, load_final, output_format='xlsx'):
+        # метод для разделения классов на требующие обработки и неизменившиеся (класс -> результирующий файл);
+        # load_final() возвращает индекс файла с итоговыми оценками и вызывается, только если он нужен
+        final = get_file_state(filename, self.final)
+        self.final = final
+
+        changed, unchanged = [], {}
+        for form in forms:
+            entry = self.forms.get(form)
+            try:
+                average = get_file_state(form_files.get(form), entry['average'] if entry else None)
+            except (ValueError, OSError):  # ошибка будет выдана при обработке класса
+                changed.append(form)
+                continue
+
+            # хэш файла с итоговыми оценками хранится для каждого класса: при обработке части классов
+            # блоки остальных проверяются заново при следующем запуске
+            if entry is None or entry['final_hash'] != final['hash']:
+                block = get_block_state(load_final(), form)
+            else:  # файл с итоговыми оценками не изменился с проверки класса - блок класса тоже
+                block = entry['final']
+            if block is None:
+                changed.append(form)
+                continue
+
+            new_entry = {'period': period, 'format': output_format, 'average': average, 'final_hash': final['hash'],
+                         'final': block, 'output': None}
+            if entry is not None and entry['period'] == period and entry['format'] == output_format and\
+                    entry['average']['hash'] == average['hash'] and entry['final']['hash'] == block['hash'] and\
+                    is_output_unchanged(entry['output']):
+                new_entry['output'] = entry['output']
+                self.forms[form] = new_entry
+                unchanged[form] = entry['output']['file']
+            else:
+                self.pending[form] = new_entry
+                changed.append(form)
+
+        return changed, unchanged
+
+    def commit(self, form, output_filename):  # метод для записи сведений об успешно обработанном классе
+        entry = self.pending.pop(form, None)
+        if entry is None:
+            return
+        stat = os.stat(output_filename)
+        entry['output'] = {'file': os.path.abspath(output_filename), 'size': stat.st_size,
+                           'mtime_ns': stat.st_mtime_ns}
+        self.forms[form] = entry
+
+    def discard(self, form):  # метод для удаления сведений о классе (при следующем запуске он обработается)
+        self.pending.pop(form, None)
+        self.forms.pop(form, None)
+
+    def save(self):  # запись во временный файл и переименование, чтобы не оставить недописанный манифест
+        path = os.path.dirname(self.filename)
+        if path:
+            os.makedirs(path, exist_ok=True)
+        temp_filename = '{}.{}.tmp'.format(self.filename, os.getpid())
+        with open(temp_filename, 'w', encoding='utf-8') as file:
+            json.dump({'version': MANIFEST_VERSION, 'final': self.final, 'forms': self.forms}, file,
+                      ensure_ascii=False, indent=1)
+        os.replace(temp_filename, self.filename)
@@ -0,0 +1,120 @@
+import numpy as np
+
+EMPTY = -1  # код пустой ячейки
+NOT_ATTESTED = -2  # код 'Н/А'
+NOT_PASSED = -3  # код 'Нзч'
+# остальные текстовые оценки кодируются следующими отрицательными числами (-4, -5, ...)
+
+PERIODS = 4  # 1, 2, 3 триместры (полугодия) и год
+
+MARK_THRESHOLDS = [2.5, 3.5, 4.5]  # границы средних баллов для оценок 3, 4, 5
+
+CLASSIFICATIONS = ['Есть неаттестации', 'Есть незачёты', 'Двоечник', 'С одной 3', 'Троечник', 'С одной 4',
+                   'Хорошист', 'Отличник']
+
+
+def is_numeric(value):  # проверка на число (в ячейке может быть как число, так и строка с числом)
+    if isinstance(value, bool):
+        return False
+    if isinstance(value, (int, float)):
+        return True
+    # isdecimal, а не isdigit: надстрочные цифры ('²') проходят isdigit, но не преобразуются в float
+    return isinstance(value, str) and (''.join(value.split('.'))).isdecimal() and value.count('.') <= 1
+
+
+def get_period_index(period):  # номер периода в хранилище
+    if period.isdigit():
+        return int(period) - 1
+    return 3
+
+
+def get_needed_marks(averages):  # рекомендуемые оценки для матрицы средних баллов (в кодах хранилища)
+    averages = np.asarray(averages, dtype=np.float64)
+    marks = np.digitize(averages, MARK_THRESHOLDS) + 2
+    marks = np.where(averages == 0, 0, marks)
+    marks = np.where(averages == EMPTY, 0, marks)  # пустая ячейка считается нулём
+    marks = np.where(averages < EMPTY, averages, marks)  # текстовые оценки переносятся без изменений
+    return marks.astype(np.int16)
+
+
+def classify_all(finals):  # оценки успеваемости для матрицы итоговых оценок (строка - ученик)
+    finals = np.asarray(finals).reshape(len(finals), -1)
+    threes = np.count_nonzero(finals == 3, axis=1)
+    fours = np.count_nonzero(finals == 4, axis=1)
+
+    conditions = [(finals == NOT_ATTESTED).any(axis=1), (finals == NOT_PASSED).any(axis=1), (finals == 2).any(axis=1),
+                  threes == 1, threes > 1, fours == 1, fours > 1, (finals == 5).any(axis=1)]
+    return np.select(conditions, CLASSIFICATIONS, default='Недостаточно данных').tolist()
+
+
+class MarkStore:  # хранилище оценок класса: матрицы ученик × предмет для каждого периода
+    def __init__(self):
+        self.students, self.student_index = [], {}
+        self.subjects, self.subject_index = [], {}
+        self.texts, self.text_index = [], {}
+        self.add_text('Н/А')
+        self.add_text('Нзч')
+
+        self.averages = np.full((PERIODS, 16, 16), EMPTY, dtype=np.float64)  # средние баллы
+        self.finals = np.full((PERIODS, 16, 16), EMPTY, dtype=np.int16)  # итоговые оценки
+
+    def add_text(self, text):  # метод для получения кода текстовой оценки
+        if text not in self.text_index.keys():
+            self.text_index[text] = EMPTY - 1 - len(self.texts)
+            self.texts.append(text)
+        return self.text_index[text]
+
+    def add_student(self, student):  # метод для получения номера ученика (новые ученики добавляются)
+        if student not in self.student_index.keys():
+            self.student_index[student] = len(self.students)
+            self.students.append(student)
+            self.reserve()
+        return self.student_index[student]
+
+    def add_subject(self, subject):  # метод для получения номера предмета (новые предметы добавляются)
+        if subject not in self.subject_index.keys():
+            self.subject_index[subject] = len(self.subjects)
+            self.subjects.append(subject)
+            self.reserve()
+        return self.subject_index[subject]
+
+    def reserve(self):  # увеличение матриц вдвое при нехватке места
+        rows, cols = self.averages.shape[1:]
+        if len(self.students) <= rows and len(self.subjects) <= cols:
+            return
+
+        rows, cols = max(rows, len(self.students) * 2), max(cols, len(self.subjects) * 2)
+        averages = np.full((PERIODS, rows, cols), EMPTY, dtype=np.float64)
+        finals = np.full((PERIODS, rows, cols), EMPTY, dtype=np.int16)
+        averages[:, :self.averages.shape[1], :self.averages.shape[2]] = self.averages
+        finals[:, :self.finals.shape[1], :self.finals.shape[2]] = self.finals
+        self.averages, self.finals = averages, finals
+
+    def encode(self, value, integer=False):  # метод для получения кода значения ячейки
+        if value is None or value == '':
+            return EMPTY
+        if is_numeric(value) and float(value) >= 0:  # отрицательные числа совпали бы с кодами пустой ячейки и текста
+            if not integer:
+                return float(value)
+            if float(value).is_integer():
+                return int(float(value))
+        return self.add_text(str(value))
+
+    def decode(self, code, integer=False):  # метод для получения значения по коду (пустая ячейка - 0)
+        if code == EMPTY:
+            code = 0
+        if code < EMPTY:
+            return self.texts[EMPTY - 1 - int(code)]
+        return int(code) if integer else float(code)
+
+    def set_average(self, period, student, subject, value):
+        self.averages[period, student, subject] = self.encode(value)
+
+    def set_final(self, period, student, subject, value):
+        self.finals[period, student, subject] = self.encode(value, integer=True)
+
+    def get_averages(self, period):  # матрица средних баллов за период
+        return self.averages[period, :len(self.students), :len(self.subjects)]
+
+    def get_finals(self, period):  # матрица итоговых оценок за период
+        return self.finals[period, :len(self.students), :len(self.subjects)]
@@ -0,0 +1,210 @@
+import os
+import zipfile
+import posixpath
+from xml.etree.ElementTree import fromstring
+
+try:  # lxml разбирает быстрее и позволяет отбирать нужные теги без обработки остальных в Python
+    from lxml.etree import iterparse
+    LXML = True
+except ImportError:
+    from xml.etree.ElementTree import iterparse
+    LXML = False
+
+from openpyxl import load_workbook
+from openpyxl.utils import get_column_letter, column_index_from_string
+
+ENGINES = ['xml', 'openpyxl']
+
+MAIN_NAMESPACES = ['http://schemas.openxmlformats.org/spreadsheetml/2006/main',
+                   'http://purl.oclc.org/ooxml/spreadsheetml/main']  # обычный и строгий формат Open XML
+
+
+def get_engine(engine=None):  # способ чтения файлов (по умолчанию - из переменной окружения EXCEL_MARKS_READER)
+    engine = engine or os.environ.get('EXCEL_MARKS_READER') or 'xml'
+    if engine not in ENGINES:
+        raise ValueError('Неизвестный способ чтения файлов: "{}"'.format(engine))
+    return engine
+
+
+def open_workbook(filename, engine=None):  # открытие файла для чтения значений ячеек
+    if get_engine(engine) == 'openpyxl':
+        return OpenpyxlReader(filename)
+    return XmlReader(filename)
+
+
+def local_name(tag):  # название тега без пространства имён
+    return tag.rpartition('}')[2]
+
+
+def cast_number(value):  # числа хранятся строками; целые - без точки и порядка (как в openpyxl)
+    if '.' in value or 'E' in value or 'e' in value:
+        return float(value)
+    return int(value)
+
+
+def get_text(element):  # текст строки: все <t>, кроме фонетических подсказок <rPh>
+    if len(element) == 1 and local_name(element[0].tag) == 't':  # обычная строка без оформления
+        return element[0].text or ''
+    parts = []
+    for child in element:
+        name = local_name(child.tag)
+        if name == 't':
+            parts.append(child.text or '')
+        elif name == 'r':
+            parts.append(get_text(child))
+    return ''.join(parts)
+
+
+class OpenpyxlReader:  # чтение через openpyxl в режиме только для чтения
+    def __init__(self, filename):
+        self.workbook = load_workbook(filename, read_only=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        self.workbook.close()
+
+    def sheet_names(self):
+        return self.workbook.sheetnames
+
+    def active_sheet(self):
+        return self.workbook.active.title
+
+    def iter_rows(self, sheet_name, min_row=1):  # строки листа кортежами значений (пустые строки - пустые кортежи)
+        sheet = self.workbook[sheet_name]
+        sheet.reset_dimensions()  # размеры листа в файле могут быть указаны неверно
+        return sheet.iter_rows(min_row=min_row, values_only=True)
+
+
+class XmlReader:  # чтение значений напрямую из xml-файлов архива xlsx (без объектов ячеек и стилей)
+    def __init__(self, filename):
+        self.archive = zipfile.ZipFile(filename)
+        self.shared_strings = None  # таблица общих строк читается один раз при первом обращении
+        self.letters = []  # буквы столбцов по номерам (для быстрой проверки адресов ячеек)
+
+        try:
+            relations = {}
+            for relation in fromstring(self.archive.read('xl/_rels/workbook.xml.rels')):
+                target = relation.get('Target')
+                if target.startswith('/'):
+                    target = target[1:]
+                else:
+                    target = posixpath.normpath(posixpath.join('xl', target))
+                relations[relation.get('Id')] = (relation.get('Type', '').rpartition('/')[2], target)
+
+            self.sheets, active = [], 0
+            for element in fromstring(self.archive.read('xl/workbook.xml')).iter():
+                if local_name(element.tag) == 'sheet':
+                    relation_id = [value for key, value in element.attrib.items() if local_name(key) == 'id'][0]
+                    self.sheets.append((element.get('name'), relations[relation_id][1]))
+                elif local_name(element.tag) == 'workbookView':
+                    active = int(element.get('activeTab', 0))
+            self.active = self.sheets[min(active, len(self.sheets) - 1)][0]
+
+            self.shared_strings_path = None
+            for relation_type, target in relations.values():
+                if relation_type == 'sharedStrings':
+                    self.shared_strings_path = target
+        except (KeyError, IndexError, SyntaxError) as e:
+            self.archive.close()
+            raise ValueError('Неправильный формат файла xlsx: {}'.format(e))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        self.archive.close()
+
+    def sheet_names(self):
+        return [name for name, path in self.sheets]
+
+    def active_sheet(self):
+        return self.active
+
+    def get_shared_strings(self):
+        if self.shared_strings is None:
+            self.shared_strings = []
+            if self.shared_strings_path is not None:
+                with self.archive.open(self.shared_strings_path) as file:
+                    for event, element in self.parse(file, 'si'):
+                        self.shared_strings.append(get_text(element))
+                        self.clear(element)
+        return self.shared_strings
+
+    @staticmethod
+    def parse(file, tag):  # потоковый разбор с событиями окончания тегов tag
+        if LXML:
+            return iterparse(file, events=('end',), tag=['{{{}}}{}'.format(namespace, tag)
+                                                         for namespace in MAIN_NAMESPACES],
+                             resolve_entities=False)
+        return ((event, element) for event, element in iterparse(file, events=('end',))
+                if local_name(element.tag) == tag)
+
+    @staticmethod
+    def clear(element):  # удаление разобранного тега, чтобы дерево не росло во время чтения
+        element.clear()
+        if LXML:
+            while element.getprevious() is not None:
+                del element.getparent()[0]
+
+    def get_letters(self, column):  # буквы столбца по номеру (с 0)
+        while len(self.letters) <= column:
+            self.letters.append(get_column_letter(len(self.letters) + 1))
+        return self.letters[column]
+
+    def read_value(self, cell, namespace):  # значение ячейки по типу (t) и тексту <v> или <is>
+        cell_type = cell.get('t', 'n')
+        value = None
+        for child in cell:
+            if child.tag == namespace + 'v':
+                value = child.text
+            elif child.tag == namespace + 'is':
+                return get_text(child)
+
+        if value is None:
+            return None
+        if cell_type == 'n':
+            return cast_number(value)
+        if cell_type == 's':
+            return self.get_shared_strings()[int(value)]
+        if cell_type == 'b':
+            return bool(int(value))
+        return value  # str (результат формулы), e (ошибка), d (дата строкой)
+
+    def read_row(self, row, row_num):  # значения ячеек строки (пропущенные ячейки - None)
+        namespace = row.tag[:-3]  # '{...}row' -> '{...}'
+        row_num = str(row_num)
+        values = []
+        for cell in row:
+            if cell.tag != namespace + 'c':
+                continue
+            reference = cell.get('r')
+            if reference is not None and reference != self.get_letters(len(values)) + row_num:  # ячейки пропущены
+                column = column_index_from_string(reference.rstrip('0123456789')) - 1
+                if column > len(values):
+                    values.extend([None] * (column - len(values)))
+            values.append(self.read_value(cell, namespace))
+        return tuple(values)
+
+    def iter_rows(self, sheet_name, min_row=1):  # строки листа кортежами значений (пустые строки - пустые кортежи)
+        path = dict(self.sheets)[sheet_name]
+        self.get_shared_strings()
+
+        with self.archive.open(path) as file:
+            row_num = 0
+            for event, row in self.parse(file, 'row'):
+                number = int(row.get('r', row_num + 1))
+                for row_num in range(row_num + 1, number):  # пропущенные в файле пустые строки
+                    if row_num >= min_row:
+                        yield ()
+                row_num = number
+                if row_num >= min_row:
+                    yield self.read_row(row, row_num)
+                self.clear(row)
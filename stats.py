@@ -0,0 +1,116 @@
+import csv
+import json
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+STAGES = {  # этапы обработки: ключ -> название в таблице
+    'load': 'Чтение файлов',
+    'header': 'Разбор шапки',
+    'rows': 'Разбор строк учеников',
+    'classification': 'Оценка успеваемости',
+    'report': 'Построение отчёта',
+    'save': 'Сохранение',
+}
+
+CSV_COLUMNS = ['form', 'stage', 'wall', 'cpu', 'memory', 'calls']
+
+
+class StageStats:  # замеры этапов обработки: время, процессорное время потока и пиковая память (tracemalloc)
+    def __init__(self, trace_memory=False):
+        self.trace_memory = trace_memory
+        self.stages = {}  # этап -> {'wall': сек., 'cpu': сек., 'memory': байт или None, 'calls': количество}
+
+    @contextmanager
+    def measure(self, stage):  # замер одного этапа (этапы не вкладываются друг в друга)
+        started = False
+        memory = 0
+        if self.trace_memory:
+            if tracemalloc.is_tracing():
+                tracemalloc.reset_peak()
+            else:
+                tracemalloc.start()
+                started = True
+            memory = tracemalloc.get_traced_memory()[0]
+
+        wall_time, cpu_time = time.perf_counter(), time.thread_time()
+        try:
+            yield
+        finally:
+            self.add(stage, time.perf_counter() - wall_time, time.thread_time() - cpu_time,
+                     tracemalloc.get_traced_memory()[1] - memory if self.trace_memory else None)
+            if started:
+                tracemalloc.stop()
+
+    def add(self, stage, wall, cpu, memory=None, calls=1):  # метод для добавления замера этапа
+        record = self.stages.setdefault(stage, {'wall': 0.0, 'cpu': 0.0, 'memory': None, 'calls': 0})
+        record['wall'] += wall
+        record['cpu'] += cpu
+        record['calls'] += calls
+        if memory is not None:  # пиковая память этапа - наибольшая из замеров
+            record['memory'] = max(record['memory'] or 0, memory)
+
+    def merge(self, other):  # метод для добавления замеров другого объекта
+        for stage, record in other.stages.items():
+            self.add(stage, record['wall'], record['cpu'], record['memory'], record['calls'])
+
+    def total(self):  # общее время всех этапов
+        return sum(record['wall'] for record in self.stages.values())
+
+    def to_dict(self):
+        return {stage: dict(record) for stage, record in self.stages.items()}
+
+
+class BatchStats:  # замеры обработки нескольких классов: по каждому классу и общие для всех классов
+    def __init__(self, trace_memory=False):
+        self.trace_memory = trace_memory
+        self.shared = StageStats(trace_memory)  # этапы, выполняемые один раз (чтение файла с итоговыми оценками)
+        self.forms = {}  # класс -> StageStats
+
+    def add_form(self, form, stats):
+        self.forms[form] = stats
+
+    def summary(self):  # сумма замеров по всем классам и общих этапов
+        summary = StageStats(self.trace_memory)
+        summary.merge(self.shared)
+        for stats in self.forms.values():
+            summary.merge(stats)
+        return summary
+
+    def format_table(self):  # таблица с итогами по этапам для вывода
+        summary = self.summary()
+        total = summary.total()
+
+        lines = ['{:<24}{:>12}{:>12}{:>12}{:>8}'.format('Этап', 'Время, сек.', 'ЦП, сек.', 'Память, МБ', 'Доля')]
+        for stage, name in STAGES.items():
+            if stage not in summary.stages.keys():
+                continue
+            record = summary.stages[stage]
+            memory = '-' if record['memory'] is None else '{:.1f}'.format(record['memory'] / 1024 / 1024)
+            share = '{:.0%}'.format(record['wall'] / total) if total > 0 else '-'
+            lines.append('{:<24}{:>12.3f}{:>12.3f}{:>12}{:>8}'.format(name, record['wall'], record['cpu'], memory,
+                                                                      share))
+        lines.append('{:<24}{:>12.3f}'.format('Всего', total))
+        return '\n'.join(lines)
+
+    def to_dict(self):
+        return {'shared': self.shared.to_dict(), 'forms': {form: stats.to_dict() for form, stats in self.forms.items()},
+                'total': self.summary().to_dict()}
+
+    def save(self, filename):  # сохранение замеров в JSON или CSV (по расширению файла)
+        if filename.endswith('.csv'):
+            self.save_csv(filename)
+        else:
+            self.save_json(filename)
+
+    def save_json(self, filename):
+        with open(filename, 'w', encoding='utf-8') as file:
+            json.dump(self.to_dict(), file, ensure_ascii=False, indent=2)
+
+    def save_csv(self, filename):  # строка на этап каждого класса (общие этапы - с пустым классом)
+        with open(filename, 'w', encoding='utf-8', newline='') as file:
+            writer = csv.DictWriter(file, CSV_COLUMNS)
+            writer.writeheader()
+            for form, stats in [('', self.shared)] + list(self.forms.items()):
+                for stage, record in stats.stages.items():
+                    writer.writerow(dict(record, form=form, stage=stage))
@@ -0,0 +1,54 @@
+# Поиск файлов со средними оценками: название класса в имени файла, пропуск временных и результирующих файлов
+# и классы, для которых найдено несколько файлов
+import pytest
+
+from analyser import RESULT_PREFIX, FormFileIndex, parse_form, get_form_files, get_collision_error
+
+
+@pytest.mark.parametrize('filename, form', [
+    ('5-А.xlsx', '5-А'),
+    ('Средние баллы 11-А.xlsx', '11-А'),
+    ('Средние баллы 1-А.xlsx', '1-А'),
+    ('Средние баллы 10-б.xlsx', '10-Б'),
+    ('2023-2024 5-А.xlsx', '5-А'),  # учебный год перед классом не принимается за класс
+    ('Средние баллы 2023-2024 11-В.xlsx', '11-В'),
+    ('12-А.xlsx', None),
+    ('111-А.xlsx', None),
+    ('5А.xlsx', None),
+    ('Итоговые оценки.xlsx', None),
+])
+def test_parse_form(filename, form):
+    assert parse_form(filename) == form
+
+
+def create_files(path, names):
+    for name in names:
+        (path / name).write_bytes(b'')
+
+
+def test_form_files(tmp_path):
+    create_files(tmp_path, ['Итоговые оценки.xlsx', 'Средние баллы 11-А.xlsx', 'Средние баллы 1-А.xlsx',
+                            '2023-2024 5-А.xlsx', '~$2023-2024 5-А.xlsx', RESULT_PREFIX + '5-А.xlsx', '6-Б.xls',
+                            'Средние баллы 6-Б.xlsx', 'Заметки.xlsx'])
+    form_files = get_form_files(str(tmp_path / 'Итоговые оценки.xlsx'))
+
+    assert form_files.forms() == ['1-А', '5-А', '6-Б', '11-А']
+    assert form_files.collisions() == {}
+    assert form_files.get('5-А') == str(tmp_path / '2023-2024 5-А.xlsx')
+    assert form_files.get('11-А') == str(tmp_path / 'Средние баллы 11-А.xlsx')
+    with pytest.raises(ValueError):
+        form_files.get('7-А')
+
+
+def test_collisions(tmp_path):
+    create_files(tmp_path, ['5-А.xlsx', 'Средние баллы 5-А.xlsx', '5-Б.xlsx', 'Средние баллы 10-А.xlsx',
+                            '10-А (копия).xlsx', '11-А.xlsx'])
+    form_files = FormFileIndex(str(tmp_path))
+
+    assert form_files.collisions() == {'5-А': ['5-А.xlsx', 'Средние баллы 5-А.xlsx'],
+                                       '10-А': ['10-А (копия).xlsx', 'Средние баллы 10-А.xlsx']}
+    assert list(form_files.collisions(['10-А', '5-Б', '5-А']).keys()) == ['10-А', '5-А']  # по порядку forms
+    with pytest.raises(ValueError) as error:
+        form_files.get('5-А')
+    assert str(error.value) == get_collision_error('5-А', ['5-А.xlsx', 'Средние баллы 5-А.xlsx'])
+    assert '"5-А.xlsx", "Средние баллы 5-А.xlsx"' in str(error.value)
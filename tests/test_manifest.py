@@ -0,0 +1,53 @@
+# Пропуск неизменившихся классов по манифесту: повторный запуск без изменений ничего не обрабатывает,
+# а изменение блока класса в файле с итоговыми оценками замечается, даже если между запусками обрабатывалась
+# только часть классов
+import os
+
+from openpyxl import load_workbook
+
+from analyser import analyse_forms
+from manifest import Manifest
+from benchmarks.generator import generate_school
+
+
+def run(filename, forms, out_path):  # инкрементальная обработка, возвращает результаты по классам
+    results = analyse_forms(filename, forms, '1', out_path=out_path, manifest=Manifest(out_path))
+    return {result['form']: result for result in results}
+
+
+def change_block(filename, form):  # изменение первой оценки первого ученика в блоке класса
+    workbook = load_workbook(filename)
+    sheet = workbook[form.split('-')[0]]
+    for row in sheet.iter_rows(min_col=2, max_col=2):
+        if row[0].value == form:
+            cell = sheet.cell(row=row[0].row + 4, column=2)
+            cell.value = '2' if cell.value != '2' else '5'
+            break
+    workbook.save(filename)
+
+
+def test_unchanged_run_skips_all(tmp_path):
+    filename, forms = generate_school(str(tmp_path), forms_per_grade=2, students=5, subjects=3)
+    out_path = str(tmp_path / 'out')
+    os.makedirs(out_path)
+
+    results = run(filename, forms, out_path)
+    assert [form for form in forms if results[form]['error'] is None and not results[form]['skipped']] == forms
+
+    results = run(filename, forms, out_path)
+    assert [form for form in forms if results[form]['skipped']] == forms
+
+
+def test_changed_block_after_partial_run(tmp_path):
+    filename, forms = generate_school(str(tmp_path), forms_per_grade=2, students=5, subjects=3)
+    out_path = str(tmp_path / 'out')
+    os.makedirs(out_path)
+    run(filename, forms, out_path)
+
+    change_block(filename, '5-Б')
+    results = run(filename, ['5-А'], out_path)  # запуск только для 5-А запоминает новое состояние файла
+    assert results['5-А']['skipped']
+
+    results = run(filename, forms, out_path)
+    assert results['5-Б']['error'] is None and not results['5-Б']['skipped']
+    assert [form for form in forms if results[form]['skipped']] == [form for form in forms if form != '5-Б']
@@ -0,0 +1,93 @@
+# Случайные проверки пакетного расчёта: исходные значения ячеек проходят через MarkStore.encode,
+# get_needed_marks и classify_all и сравниваются с прежними поэлементными is_number, get_needed_mark и classify
+import random
+
+import pytest
+
+from analyser import is_number, get_needed_mark, classify
+from marks import MarkStore, get_needed_marks, classify_all
+
+TEXT_VALUES = ['Н/А', 'Нзч', 'осв', 'зач', '1.2.3', '4.', '.5', '..', '4,5', ' 4', '-1', '²', '４.５', '']
+BOUNDARIES = [0, 2.49, 2.5, 3.49, 3.5, 4.49, 4.5, 5]  # границы рекомендуемых оценок
+FINAL_VALUES = [2, 3, 4, 5, '2', '3', '4', '5', 'Н/А', 'Нзч', 'зач', True, None, '']
+
+
+def random_average(rng):  # значение ячейки среднего балла: число, число строкой, текст или пустая ячейка
+    kind = rng.random()
+    if kind < 0.25:
+        return round(rng.uniform(0, 5), rng.randint(0, 3))
+    if kind < 0.45:
+        return str(round(rng.uniform(0, 5), rng.randint(0, 3)))
+    if kind < 0.55:
+        return rng.randint(-2, 5)
+    if kind < 0.7:
+        value = rng.choice(BOUNDARIES)
+        return str(value) if rng.random() < 0.5 else value
+    if kind < 0.8:
+        return rng.choice([None, True])
+    return rng.choice(TEXT_VALUES)
+
+
+def get_cell_text(value):  # текст ячейки, который получал прежний код (пустая ячейка - '0')
+    if value is None or value == '':
+        return '0'
+    return str(value)
+
+
+def legacy_recommended(value):  # рекомендуемая оценка прежним кодом (None - прежний код падал на значении)
+    try:
+        mark = get_needed_mark(get_cell_text(value))
+    except ValueError:  # is_number пропускал '1.2.3' и '²', а float на них падал
+        return None
+    return int(mark) if is_number(mark) else mark
+
+
+def legacy_classification(values):  # оценка успеваемости прежним кодом (пустые ячейки не учитывались)
+    return classify([None if value in (None, '') else str(value) for value in values])
+
+
+def create_store(averages, finals):  # хранилище с оценками за первый период (строка - ученик)
+    store = MarkStore()
+    for student_index, (average_row, final_row) in enumerate(zip(averages, finals)):
+        student = store.add_student('Ученик {}'.format(student_index))
+        for subject_index, (average, final) in enumerate(zip(average_row, final_row)):
+            subject = store.add_subject('Предмет {}'.format(subject_index))
+            store.set_average(0, student, subject, average)
+            store.set_final(0, student, subject, final)
+    return store
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_matches_scalar_functions(seed):
+    rng = random.Random(seed)
+    for _ in range(20):
+        students, subjects = rng.randint(1, 30), rng.randint(1, 15)
+        averages = [[random_average(rng) for _ in range(subjects)] for _ in range(students)]
+        finals = [[rng.choice(FINAL_VALUES) for _ in range(subjects)] for _ in range(students)]
+        store = create_store(averages, finals)
+
+        recommended = get_needed_marks(store.get_averages(0))
+        for student in range(students):
+            for subject in range(subjects):
+                value = averages[student][subject]
+                actual = store.decode(recommended[student, subject], integer=True)
+                expected = legacy_recommended(value)
+                if expected is None:  # некорректное число считается текстовой оценкой
+                    expected = str(value)
+                assert actual == expected, (value, actual, expected)
+
+        assert classify_all(store.get_finals(0)) == [legacy_classification(row) for row in finals]
+
+
+@pytest.mark.parametrize('value, expected', [
+    (None, 0), ('', 0), (0, 0), ('0.0', 0), (2.49, 2), ('2.5', 3), (3.49, 3), ('3.5', 4), (4.49, 4), ('4.5', 5),
+    (5, 5), ('Н/А', 'Н/А'), ('1.2.3', '1.2.3'), ('²', '²'), ('４.５', 5), (-1, '-1'), (-2.0, '-2.0'), (True, 'True'),
+])
+def test_recommended_mark_of_cell(value, expected):
+    store = create_store([[value]], [[None]])
+    assert store.decode(get_needed_marks(store.get_averages(0))[0, 0], integer=True) == expected
+
+
+def test_classification_ignores_empty_cells():
+    store = create_store([[None] * 3, [None] * 3], [[None, '', 5], [None, None, None]])
+    assert classify_all(store.get_finals(0)) == ['Отличник', 'Недостаточно данных']
@@ -0,0 +1,187 @@
+# Сравнение способов чтения файлов: книги собираются из xml вручную (общие, встроенные строки и строки с оформлением,
+# пропущенные ячейки и строки, логические значения и дробные числа), а read_average_marks и FinalMarksIndex
+# должны возвращать одно и то же при чтении через xml и через openpyxl
+import zipfile
+from xml.etree import ElementTree
+from xml.sax.saxutils import escape
+
+import pytest
+
+import readers
+from analyser import FinalMarksIndex, read_average_marks
+from benchmarks.generator import generate_school
+
+MAIN = 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'
+RELATIONSHIPS = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+PACKAGE = 'http://schemas.openxmlformats.org/package/2006/relationships'
+
+STYLES = ('<styleSheet xmlns="{}"><fonts count="1"><font><sz val="11"/><name val="Calibri"/></font></fonts>'
+          '<fills count="1"><fill><patternFill patternType="none"/></fill></fills>'
+          '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+          '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+          '<cellXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/></cellXfs>'
+          '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+          '</styleSheet>').format(MAIN)
+
+
+def write_xlsx(filename, sheets, shared_strings=(), active=0):  # книга из листов (название, xml строк)
+    # и общих строк (xml содержимого <si>)
+    content_types = ['<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument'
+                     '.spreadsheetml.sheet.main+xml"/>',
+                     '<Override PartName="/xl/styles.xml" ContentType="application/vnd.openxmlformats-officedocument'
+                     '.spreadsheetml.styles+xml"/>',
+                     '<Override PartName="/xl/sharedStrings.xml" ContentType="application/vnd.openxmlformats-'
+                     'officedocument.spreadsheetml.sharedStrings+xml"/>']
+    relations = ['<Relationship Id="rIdStyles" Type="{}/styles" Target="styles.xml"/>'.format(RELATIONSHIPS),
+                 '<Relationship Id="rIdStrings" Type="{}/sharedStrings" Target="sharedStrings.xml"/>'.format(
+                     RELATIONSHIPS)]
+    sheet_elements = []
+
+    with zipfile.ZipFile(filename, 'w') as archive:
+        for index, (name, rows) in enumerate(sheets, 1):
+            content_types.append('<Override PartName="/xl/worksheets/sheet{}.xml" ContentType="application/'
+                                 'vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'.format(index))
+            relations.append('<Relationship Id="rId{0}" Type="{1}/worksheet" Target="worksheets/sheet{0}.xml"/>'
+                             .format(index, RELATIONSHIPS))
+            sheet_elements.append('<sheet name="{}" sheetId="{}" r:id="rId{}"/>'.format(escape(name), index, index))
+            archive.writestr('xl/worksheets/sheet{}.xml'.format(index),
+                             '<worksheet xmlns="{}"><sheetData>{}</sheetData></worksheet>'.format(MAIN, rows))
+
+        archive.writestr('[Content_Types].xml', '<Types xmlns="http://schemas.openxmlformats.org/package/2006/'
+                         'content-types"><Default Extension="rels" ContentType="application/vnd.openxmlformats-'
+                         'package.relationships+xml"/><Default Extension="xml" ContentType="application/xml"/>{}'
+                         '</Types>'.format(''.join(content_types)))
+        archive.writestr('_rels/.rels', '<Relationships xmlns="{}"><Relationship Id="rId1" Type="{}/officeDocument" '
+                         'Target="xl/workbook.xml"/></Relationships>'.format(PACKAGE, RELATIONSHIPS))
+        archive.writestr('xl/workbook.xml', '<workbook xmlns="{}" xmlns:r="{}"><bookViews><workbookView activeTab='
+                         '"{}"/></bookViews><sheets>{}</sheets></workbook>'.format(MAIN, RELATIONSHIPS, active,
+                                                                                   ''.join(sheet_elements)))
+        archive.writestr('xl/_rels/workbook.xml.rels', '<Relationships xmlns="{}">{}</Relationships>'.format(
+            PACKAGE, ''.join(relations)))
+        archive.writestr('xl/styles.xml', STYLES)
+        archive.writestr('xl/sharedStrings.xml', '<sst xmlns="{}" count="{}" uniqueCount="{}">{}</sst>'.format(
+            MAIN, len(shared_strings), len(shared_strings), ''.join('<si>{}</si>'.format(item)
+                                                                    for item in shared_strings)))
+
+
+def row(number, cells, numbered=True):  # строка листа (без номера, если numbered=False)
+    return '<row{}>{}</row>'.format(' r="{}"'.format(number) if numbered else '', ''.join(cells))
+
+
+def shared(reference, index):  # ячейка с общей строкой (reference=None - без адреса)
+    return '<c{} t="s"><v>{}</v></c>'.format(address(reference), index)
+
+
+def inline(reference, text):  # ячейка со встроенной строкой (text - xml содержимого <is>)
+    return '<c{} t="inlineStr"><is>{}</is></c>'.format(address(reference), text)
+
+
+def value(reference, text, cell_type=None):  # ячейка с числом, логическим значением или строкой формулы
+    return '<c{}{}><v>{}</v></c>'.format(address(reference), ' t="{}"'.format(cell_type) if cell_type else '', text)
+
+
+def address(reference):
+    return ' r="{}"'.format(reference) if reference else ''
+
+
+def plain(text):
+    return '<t>{}</t>'.format(escape(text))
+
+
+def rich(*parts):  # строка с оформленными частями и фонетической подсказкой, которая не входит в текст
+    runs = ''.join('<r><rPr><b/></rPr><t xml:space="preserve">{}</t></r>'.format(escape(part)) for part in parts)
+    return runs + '<rPh sb="0" eb="1"><t>подсказка</t></rPh>'
+
+
+@pytest.fixture(params=['lxml', 'etree'])
+def parser(request, monkeypatch):  # чтение через lxml и через запасной разбор xml.etree
+    if request.param == 'etree':
+        monkeypatch.setattr(readers, 'LXML', False)
+        monkeypatch.setattr(readers, 'iterparse', ElementTree.iterparse)
+    elif not readers.LXML:
+        pytest.skip('lxml не установлен')
+    return request.param
+
+
+@pytest.fixture
+def average_file(tmp_path):  # файл со средними оценками: активный второй лист, шапка в 6-й строке
+    strings = [plain('Средние баллы'), plain('Математика'), rich('Русский ', 'язык'), plain('Иванов Иван'),
+               plain('Н/А'), plain('4.5')]
+    rows = ''.join([
+        row(1, [shared('A1', 0)]),  # строки 2-5 пропущены
+        row(6, [inline('A6', plain('Ученик')), shared('B6', 1), shared('C6', 2), inline('D6', rich('Физ', 'ика')),
+                inline('E6', plain('История')), value('F6', '', 'str')]),
+        row(7, [shared('A7', 3), value('B7', '4.5'), value('C7', '3.49'), value('D7', '5'), shared('E7', 4)]),
+        row(8, [inline('A8', plain('Петров Пётр')), value('C8', '2.5'), value('E8', '1', 'b')]),  # B8, D8 пропущены
+        row(9, [inline(None, plain('Сидоров Сидор')), shared(None, 5), value(None, '4.5E0'), value(None, '0', 'b'),
+                value(None, '3.5', 'str')], numbered=False),
+        row(11, [inline('A11', rich('Козлов ', 'Коля')), value('B11', '-1'), value('E11', '0.1')]),  # 10 пропущена
+        row(12, []),
+        row(13, [inline('A13', plain('После пустой строки')), value('B13', '5')]),
+    ])
+    filename = str(tmp_path / 'Средние баллы 5-А.xlsx')
+    write_xlsx(filename, [('Пустой', row(1, [inline('A1', plain('не тот лист'))])), ('Оценки', rows)], strings,
+               active=1)
+    return filename
+
+
+@pytest.fixture
+def final_file(tmp_path):  # файл с итоговыми оценками: два класса на листе, лист без номера и пропуски
+    strings = [plain('5-А'), plain('Итоговые оценки'), plain('Математика'), rich('Рус', 'ский'), plain('1 триместр'),
+               plain('Год'), plain('Нзч'), plain('5-Б'), plain('6-А')]
+
+    def block(first_row, form_index, students, numbered=True):  # строки блока класса (students - функции ячеек
+        # оценок по столбцам B-E, None - пропущенная ячейка)
+        rows = [row(first_row, [shared('B{}'.format(first_row), form_index)], numbered),
+                row(first_row + 1, [shared('B{}'.format(first_row + 1), 1)], numbered),
+                row(first_row + 2, [shared('B{}'.format(first_row + 2), 2), shared('D{}'.format(first_row + 2), 3)],
+                    numbered),
+                row(first_row + 3, [shared('B{}'.format(first_row + 3), 4), shared('C{}'.format(first_row + 3), 5),
+                                    shared('D{}'.format(first_row + 3), 4), inline('E{}'.format(first_row + 3),
+                                                                                   rich('Г', 'од'))], numbered)]
+        for index, marks in enumerate(students):
+            number = first_row + 4 + index
+            rows.append(row(number, [inline('A{}'.format(number), plain('Ученик {} Имя Отчество'.format(index)))] +
+                            [cell('{}{}'.format('BCDE'[col], number)) for col, cell in enumerate(marks)
+                             if cell is not None], numbered))
+        return ''.join(rows)
+
+    sheet_5 = block(1, 0, [[lambda ref: value(ref, '5'), lambda ref: value(ref, '4.0'), None,
+                            lambda ref: shared(ref, 6)],
+                           [lambda ref: value(ref, '1', 'b'), None, lambda ref: value(ref, '3'),
+                            lambda ref: inline(ref, plain('Н/А'))]])
+    sheet_5 += block(20, 7, [[None, None, None, lambda ref: value(ref, '2')],
+                             [lambda ref: value(ref, '4.5'), lambda ref: value(ref, '3', 'str'), None, None]])
+    sheet_6 = block(1, 8, [[lambda ref: value(ref, '3'), lambda ref: value(ref, '0', 'b'), None, None]],
+                    numbered=False)
+
+    filename = str(tmp_path / 'Итоговые оценки.xlsx')
+    write_xlsx(filename, [('5', sheet_5), ('Прочее', row(1, [inline('B1', plain('5-В'))])), ('6', sheet_6)],
+               strings)
+    return filename
+
+
+def test_average_marks_engines(parser, average_file):
+    average_marks = read_average_marks(average_file, 'xml')
+    assert average_marks == read_average_marks(average_file, 'openpyxl')
+    assert average_marks['subjects'] == ['Математика', 'Русский язык', 'Физика', 'История']
+    assert [student for student, marks in average_marks['students']] == [
+        'Иванов Иван', 'Петров Пётр', 'Сидоров Сидор']  # строки 10 нет, чтение останавливается на ней
+    assert average_marks['students'][1][1] == [None, 2.5, None, True]
+
+
+def test_final_marks_engines(parser, final_file):
+    forms = FinalMarksIndex(final_file, engine='xml').forms
+    assert forms == FinalMarksIndex(final_file, engine='openpyxl').forms
+    assert sorted(forms.keys()) == ['5-А', '5-Б', '6-А']
+    assert forms['5-А']['subjects'] == ['Математика', 'Математика', 'Русский', 'Русский']
+    assert forms['5-А']['periods'] == ['1 триместр', 'Год', '1 триместр', 'Год']
+
+
+def test_generated_school_engines(parser, tmp_path):  # файлы, записанные openpyxl (общие строки, объединённые ячейки)
+    final_filename, forms = generate_school(str(tmp_path), forms_per_grade=1, students=5, subjects=3)
+    assert FinalMarksIndex(final_filename, engine='xml').forms == FinalMarksIndex(final_filename,
+                                                                                  engine='openpyxl').forms
+    for form in forms:
+        filename = str(tmp_path / 'Средние баллы {}.xlsx'.format(form))
+        assert read_average_marks(filename, 'xml') == read_average_marks(filename, 'openpyxl')
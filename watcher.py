@@ -0,0 +1,165 @@
+import os
+import sys
+import time
+import struct
+import select
+import ctypes
+import ctypes.util
+
+from analyser import RESULT_PREFIX, FinalMarksIndex, parse_form, get_form_files, analyse_forms
+from manifest import Manifest
+
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = 0o2000000
+EVENT_HEADER = struct.Struct('iIII')  # wd, mask, cookie, len
+
+
+class InotifyWatcher:  # отслеживание изменений файлов в папке через inotify (Linux)
+    def __init__(self, path):
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1')
+
+        mask = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE  # Excel сохраняет файл через переименование
+        if libc.inotify_add_watch(self.fd, os.fsencode(path or '.'), mask) < 0:
+            error = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(error, 'inotify_add_watch')
+
+    def wait(self, timeout=None):  # метод для получения имён изменённых файлов (пустое множество - истекло время)
+        if not select.select([self.fd], [], [], timeout)[0]:
+            return set()
+
+        names = set()
+        data = os.read(self.fd, 64 * 1024)
+        offset = 0
+        while offset < len(data):
+            name_length = EVENT_HEADER.unpack_from(data, offset)[3]
+            offset += EVENT_HEADER.size
+            names.add(os.fsdecode(data[offset:offset + name_length].rstrip(b'\0')))
+            offset += name_length
+        return names
+
+    def close(self):
+        os.close(self.fd)
+
+
+class PollingWatcher:  # отслеживание изменений файлов в папке опросом (размер и время изменения)
+    def __init__(self, path, interval=1.0):
+        self.path = path or '.'
+        self.interval = interval  # период опроса папки в секундах
+        self.files = self.scan()
+
+    def scan(self):
+        files = {}
+        for entry in os.scandir(self.path):
+            try:
+                stat = entry.stat()
+            except OSError:  # файл удалён во время просмотра папки
+                continue
+            files[entry.name] = (stat.st_size, stat.st_mtime_ns)
+        return files
+
+    def wait(self, timeout=None):  # метод для получения имён изменённых файлов (пустое множество - истекло время)
+        end_time = None if timeout is None else time.monotonic() + timeout
+        while True:
+            delay = self.interval if end_time is None else min(self.interval, end_time - time.monotonic())
+            if delay > 0:
+                time.sleep(delay)
+
+            files = self.scan()
+            names = {name for name, state in files.items() if self.files.get(name) != state}
+            self.files = files
+            if names or (end_time is not None and time.monotonic() >= end_time):
+                return names
+
+    def close(self):
+        pass
+
+
+def create_watcher(path, poll=False, interval=1.0):  # inotify, если доступен, иначе опрос папки
+    if not poll and sys.platform.startswith('linux'):
+        try:
+            return InotifyWatcher(path)
+        except (OSError, AttributeError):  # нет inotify или превышен лимит отслеживаемых папок
+            pass
+    return PollingWatcher(path, interval)
+
+
+def get_changed_forms(names, final_name):  # классы, затронутые изменением файлов (None - все классы)
+    forms = set()
+    for name in names:
+        if not name.endswith('.xlsx') or name.startswith('~$') or name.startswith(RESULT_PREFIX):
+            continue
+        if name == final_name:  # изменился файл с итоговыми оценками - проверяются все классы
+            return None
+        form = parse_form(name)
+        if form is not None:
+            forms.add(form)
+    return forms
+
+
+def wait_for_changes(watcher, final_name, debounce=2.0):  # ожидание изменений с объединением серии записей:
+    # обработка начинается после debounce секунд без новых изменений (но не позже 5 * debounce от первого)
+    forms, first_time = set(), None
+    while True:
+        if first_time is None:
+            timeout = None
+        else:
+            timeout = min(debounce, first_time + debounce * 5 - time.monotonic())
+            if timeout <= 0:
+                return forms
+
+        names = watcher.wait(timeout)
+        if not names:
+            if first_time is not None:
+                return forms
+            continue
+
+        changed = get_changed_forms(names, final_name)
+        if changed is None:
+            forms = None
+        elif forms is not None:
+            forms |= changed
+        if first_time is None and (forms is None or len(forms) != 0):
+            first_time = time.monotonic()
+
+
+def watch_folder(filename, period, out_path='', jobs=1, debounce=2.0, poll=False, interval=1.0, cache=None,
+                 on_wait=None, output_format='xlsx'):
+    # обработка классов при появлении и изменении файлов в папке файла с итоговыми оценками (выдаёт результаты
+    # по мере обработки); неизменившиеся классы пропускаются по манифесту, on_wait() вызывается перед ожиданием
+    path, final_name = os.path.dirname(filename), os.path.basename(filename)
+    watcher = create_watcher(path, poll, interval)
+    manifest = Manifest(out_path)
+    final = None  # (размер и время изменения, FinalMarksIndex) - файл с итоговыми оценками читается заново,
+    # только если он изменился
+
+    try:
+        forms = None  # при запуске проверяются все классы
+        while True:
+            form_files = get_form_files(filename)  # папка просматривается заново: могли появиться новые файлы
+            batch = [form for form in form_files.forms() if forms is None or form in forms]
+            try:
+                if len(batch) != 0:
+                    stat = os.stat(filename)
+                    if final is None or final[0] != (stat.st_size, stat.st_mtime_ns):
+                        final = None
+                        final = ((stat.st_size, stat.st_mtime_ns), FinalMarksIndex.load(filename, cache))
+                    yield from analyse_forms(filename, batch, period, jobs, out_path, cache=cache,
+                                             form_files=form_files, manifest=manifest, output_format=output_format,
+                                             final_marks=final[1])
+            except Exception as e:  # файл с итоговыми оценками может быть ещё не дописан - ждём следующего изменения
+                yield {'form': final_name, 'filename': None, 'duration': None, 'error': str(e), 'analyser': None,
+                       'stats': None, 'skipped': False, 'mismatches': None}
+
+            if on_wait is not None:
+                on_wait()
+            forms = wait_for_changes(watcher, final_name, debounce)
+    finally:
+        watcher.close()